@@ -0,0 +1,64 @@
+# benchmarks/bench_compact_model.py
+"""Parity and latency of the CompactForest export against the sklearn forest it came from.
+
+    python -m benchmarks.bench_compact_model --rows 100000 --trees 200
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from benchmarks.synthetic import generate_housing_frame
+from src.compact_model import CompactForest, check_parity
+from src.config import SEED
+from src.train import apply_labeling_option_B, encode_data, per_row_latency_ms
+
+
+def _batch_seconds(model, X, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(rows, trees=200, max_depth=None, batch_rows=10_000, n_jobs=1):
+    df, _ = encode_data(apply_labeling_option_B(generate_housing_frame(rows, seed=SEED)))
+    X, y = df.drop(columns=["Good_Investment"]), df["Good_Investment"]
+    model = RandomForestClassifier(n_estimators=trees, max_depth=max_depth, random_state=SEED,
+                                   n_jobs=n_jobs).fit(X, y)
+    compact = CompactForest.from_sklearn(model)
+
+    batch = X.iloc[:batch_rows]
+    max_abs_diff = check_parity(model, compact, batch)
+    labels_match = bool(np.array_equal(model.predict(batch), compact.predict(batch)))
+    assert max_abs_diff <= 1e-12 and labels_match, f"parity failed: max |dp| = {max_abs_diff}"
+
+    sklearn_batch = _batch_seconds(model, batch)
+    compact_batch = _batch_seconds(compact, batch)
+    return {
+        "rows": rows,
+        "trees": trees,
+        "nodes": int(len(compact.feature)),
+        "max_depth": compact.max_depth,
+        "max_abs_proba_diff": max_abs_diff,
+        "labels_match": labels_match,
+        "sklearn_row_ms": per_row_latency_ms(model, X),
+        "compact_row_ms": per_row_latency_ms(compact, X),
+        "sklearn_batch_rows_per_s": len(batch) / sklearn_batch,
+        "compact_batch_rows_per_s": len(batch) / compact_batch,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--batch-rows", type=int, default=10_000)
+    parser.add_argument("--n-jobs", type=int, default=1, help="Threads for the sklearn forest")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.trees, args.max_depth, args.batch_rows, args.n_jobs), indent=2))
@@ -0,0 +1,61 @@
+# benchmarks/bench_feature_pipeline.py
+"""Fused DerivedFeatures vs the OutlierFlagger -> PricePerSqftAdder -> AgeCalculator chain.
+
+    python -m benchmarks.bench_feature_pipeline --rows 200000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from benchmarks.synthetic import generate_housing_frame
+from src.transformers import AgeCalculator, DerivedFeatures, OutlierFlagger, PricePerSqftAdder
+
+NUMERIC_COLS = ["BHK", "Size_in_SqFt", "Price_in_Lakhs", "Price_per_SqFt", "Year_Built", "Floor_No",
+                "Total_Floors", "Age_of_Property", "Nearby_Schools", "Nearby_Hospitals"]
+
+
+def _measure(transformer, df, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        transformer.transform(df)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    out = transformer.transform(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, {"best_seconds": min(times), "mean_seconds": float(np.mean(times)), "peak_mb": peak / 2 ** 20}
+
+
+def run(rows, repeats=5, seed=0):
+    df = generate_housing_frame(rows, seed=seed)
+    chain = Pipeline([
+        ("outlier_flag", OutlierFlagger(numeric_cols=NUMERIC_COLS)),
+        ("price_per_sqft", PricePerSqftAdder()),
+        ("age", AgeCalculator()),
+    ]).fit(df)
+    fused = DerivedFeatures(numeric_cols=NUMERIC_COLS).set_output(transform="pandas").fit(df)
+
+    chain_out, chain_stats = _measure(chain, df, repeats)
+    fused_out, fused_stats = _measure(fused, df, repeats)
+    same = list(chain_out.columns) == list(fused_out.columns) and chain_out.equals(fused_out.astype(chain_out.dtypes))
+    return {
+        "rows": rows,
+        "input_mb": df.memory_usage(deep=False).sum() / 2 ** 20,
+        "chain": chain_stats,
+        "fused": fused_stats,
+        "speedup": chain_stats["best_seconds"] / fused_stats["best_seconds"],
+        "identical_output": bool(same),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps([run(n, args.repeats) for n in args.rows], indent=2))
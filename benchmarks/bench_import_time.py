@@ -0,0 +1,69 @@
+# benchmarks/bench_import_time.py
+"""Cold import time of the serving modules, checked against a budget.
+
+    python -m benchmarks.bench_import_time --repeats 5 --budget 1.25
+
+Each measurement runs in a fresh interpreter, so nothing is shared through
+``sys.modules`` or the import cache. Exits non-zero if a module's median
+import time exceeds ``--budget`` seconds or it pulls in one of the heavy
+libraries that should only load on first use.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ("src.predict", "src.serve", "src.explain")
+# Loaded lazily by the code paths that need them (MLflow-indexed models, SHAP, tuning, training)
+HEAVY_MODULES = ("mlflow", "shap", "optuna", "xgboost", "lightgbm", "sklearn")
+IMPORT_BUDGET_SECONDS = 1.25
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeats=5):
+    timings, heavy = [], set()
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy.update(result["heavy"])
+    return {
+        "median_seconds": float(np.median(timings)),
+        "min_seconds": float(np.min(timings)),
+        "max_seconds": float(np.max(timings)),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def run(modules=MODULES, repeats=5, budget=IMPORT_BUDGET_SECONDS):
+    results = {m: measure(m, repeats) for m in modules}
+    failures = []
+    for module, stats in results.items():
+        if stats["median_seconds"] > budget:
+            failures.append(f"{module} took {stats['median_seconds']:.2f}s (budget {budget:.2f}s)")
+        if stats["heavy_modules"]:
+            failures.append(f"{module} imported {', '.join(stats['heavy_modules'])} at import time")
+    return {"budget_seconds": budget, "repeats": repeats, "modules": results, "failures": failures}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_SECONDS, help="Max median seconds per module")
+    args = parser.parse_args()
+    report = run(args.modules, args.repeats, args.budget)
+    print(json.dumps(report, indent=2))
+    assert not report["failures"], "Import budget exceeded:\n" + "\n".join(report["failures"])
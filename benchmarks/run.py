@@ -0,0 +1,138 @@
+# benchmarks/run.py
+"""End-to-end benchmark: load, encode, preprocess, score and predict on synthetic data.
+
+    python -m benchmarks.run --rows 1000 100000 1000000 --output bench.json
+
+Results carry the git commit, Python/library versions and machine details so
+JSON files from different commits can be compared directly.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DATA_DIR = PROJECT_ROOT / "data" / "bench"
+SUITES = ("load_data", "encode_data", "preprocessing", "investment_score", "predict_single", "predict_batch")
+LIBRARIES = ("numpy", "pandas", "scikit-learn", "scipy", "pyarrow", "lightgbm", "xgboost", "shap", "mlflow")
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    versions = {}
+    for name in LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "libraries": versions,
+    }
+
+
+def _timed(results, name, fn):
+    start = time.perf_counter()
+    results[name] = fn()
+    print(f"  {name}: {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+def run_size(rows, suites, data_dir, model_dir, args):
+    from benchmarks import suites as bench
+    from benchmarks.synthetic import write_housing_csv
+    from src.train import peak_memory_mb
+
+    csv_path = Path(data_dir) / f"housing_{rows}.csv"
+    if not csv_path.exists():
+        write_housing_csv(csv_path, rows, seed=args.seed)
+    print(f"{rows} rows ({csv_path})", file=sys.stderr)
+
+    results = {}
+    load_stats, df = bench.bench_load_data(csv_path)
+    if "load_data" in suites:
+        results["load_data"] = load_stats
+    if "encode_data" in suites:
+        _timed(results, "encode_data", lambda: bench.bench_encode_data(df))
+    if "preprocessing" in suites:
+        _timed(results, "preprocessing", lambda: bench.bench_preprocessing(
+            df, max_rows=args.preprocess_rows, imputation=args.imputation))
+    if "investment_score" in suites:
+        _timed(results, "investment_score", lambda: bench.bench_investment_score(df))
+    if "predict_single" in suites:
+        records = df.head(args.single_calls).to_dict(orient="records")
+        _timed(results, "predict_single", lambda: bench.bench_predict_single(records))
+    if "predict_batch" in suites:
+        batch = df if args.batch_rows is None else df.head(args.batch_rows)
+        _timed(results, "predict_batch", lambda: bench.bench_predict_batch(batch))
+    results["peak_rss_mb"] = peak_memory_mb()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                        help="Where synthetic CSVs are written and reused")
+    parser.add_argument("--model-dir", type=Path, default=None,
+                        help="Artifacts to benchmark predict with; by default a model is trained on the smallest size")
+    parser.add_argument("--train-rows", type=int, default=None, help="Rows used to train the default model")
+    parser.add_argument("--preprocess-rows", type=int, default=200_000,
+                        help="Cap on rows for build_preprocessing (the iterative imputer is superlinear)")
+    parser.add_argument("--imputation", default=None)
+    parser.add_argument("--single-calls", type=int, default=200)
+    parser.add_argument("--batch-rows", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    # src.config reads the model directory at import, so it must be set before any src import
+    model_dir = args.model_dir or Path(tempfile.mkdtemp(prefix="bench_models_"))
+    os.environ["REAL_ESTATE_MODEL_DIR"] = str(model_dir)
+    needs_model = any(s.startswith("predict") for s in args.suites)
+    if needs_model and not (model_dir / "rf_investment_model.joblib").exists():
+        from benchmarks import suites as bench
+        from benchmarks.synthetic import write_housing_csv
+
+        train_rows = args.train_rows or min(args.rows)
+        train_csv = args.data_dir / f"housing_{train_rows}.csv"
+        if not train_csv.exists():
+            write_housing_csv(train_csv, train_rows, seed=args.seed)
+        bench.prepare_model_dir(train_csv, model_dir)
+
+    report = {
+        "environment": environment(),
+        "settings": {"suites": args.suites, "model_dir": str(model_dir), "seed": args.seed,
+                     "preprocess_rows": args.preprocess_rows, "imputation": args.imputation},
+        "results": {str(rows): run_size(rows, args.suites, args.data_dir, model_dir, args) for rows in args.rows},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
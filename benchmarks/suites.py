@@ -0,0 +1,123 @@
+# benchmarks/suites.py
+"""Timed stages of the training and serving paths, used by ``benchmarks.run``.
+
+Every suite returns a flat dict of numbers so results from different commits
+can be diffed key by key. Import this module only after REAL_ESTATE_MODEL_DIR
+is set, since ``src.predict`` resolves its artifact paths at import time.
+"""
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.artifacts import file_sha256
+from src.compact_model import CompactForest, is_exportable
+from src.feature_engineering import compute_investment_score
+from src.preprocessing import build_preprocessing, describe_matrix
+from src.train import apply_labeling_option_B, build_model, encode_data, load_data, load_training_matrix
+
+
+def _best_of(fn, repeats):
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), float(np.mean(timings)), result
+
+
+def _throughput(rows, seconds):
+    return {"rows": rows, "best_seconds": seconds, "rows_per_second": rows / seconds if seconds > 0 else None}
+
+
+def bench_load_data(csv_path, repeats=1):
+    best, mean, df = _best_of(lambda: load_data(csv_path, use_cache=False), repeats)
+    out = _throughput(len(df), best)
+    out.update({"mean_seconds": mean, "frame_mb": df.memory_usage(deep=True).sum() / 2 ** 20})
+    return out, df
+
+
+def bench_encode_data(df, repeats=1):
+    best, mean, _ = _best_of(lambda: encode_data(df), repeats)
+    out = _throughput(len(df), best)
+    out["mean_seconds"] = mean
+    return out
+
+
+def bench_preprocessing(df, max_rows=None, repeats=1, **options):
+    labeled = apply_labeling_option_B(df if max_rows is None else df.head(max_rows))
+    X, y = labeled.drop(columns=["Good_Investment"]), labeled["Good_Investment"]
+    pipeline, *_ = build_preprocessing(labeled, "Good_Investment", **options)
+    fit_best, _, Xt = _best_of(lambda: pipeline.fit_transform(X, y), repeats)
+    transform_best, _, Xt = _best_of(lambda: pipeline.transform(X), repeats)
+    info = describe_matrix(Xt)
+    return {
+        "rows": len(X),
+        "fit_transform_seconds": fit_best,
+        "transform_seconds": transform_best,
+        "transform_rows_per_second": len(X) / transform_best if transform_best > 0 else None,
+        "matrix_mb": info["nbytes"] / 2 ** 20,
+        "matrix_shape": info["shape"],
+        "matrix_format": info["format"],
+    }
+
+
+def bench_investment_score(df, repeats=3):
+    best, mean, _ = _best_of(lambda: compute_investment_score(df), repeats)
+    out = _throughput(len(df), best)
+    out["mean_seconds"] = mean
+    return out
+
+
+def prepare_model_dir(csv_path, model_dir, backend="rf"):
+    """Train a model on ``csv_path`` and write the artifacts ``src.predict`` loads into ``model_dir``."""
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    X, y, city_medians, encoding, _ = load_training_matrix(csv_path, use_cache=False)
+    model = build_model(backend).fit(X, y)
+
+    city_medians.save(model_dir / "city_medians.json")
+    encoding.save(model_dir / "encoding_tables.json")
+    with open(model_dir / "feature_columns.json", "w", encoding="utf-8") as f:
+        json.dump(list(X.columns), f, indent=2)
+    joblib.dump(model, model_dir / "rf_investment_model.joblib")
+    if is_exportable(model):
+        CompactForest.from_sklearn(model, file_sha256(model_dir / "rf_investment_model.joblib")).save(
+            model_dir / "compact_model.npz")
+    return model_dir
+
+
+def bench_predict_single(records, warmup=5):
+    from src.predict import predict_from_dict, warm_up
+
+    start = time.perf_counter()
+    warm_up()
+    load_seconds = time.perf_counter() - start
+    for record in records[:warmup]:
+        predict_from_dict(record)
+
+    timings = []
+    for record in records:
+        start = time.perf_counter()
+        predict_from_dict(record)
+        timings.append(time.perf_counter() - start)
+    ms = np.asarray(timings) * 1000
+    return {
+        "calls": len(records),
+        "model_load_seconds": load_seconds,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def bench_predict_batch(df, chunk_size=None, repeats=1):
+    from src.predict import BATCH_CHUNK_SIZE, predict_batch
+
+    chunk_size = chunk_size or BATCH_CHUNK_SIZE
+    best, mean, _ = _best_of(lambda: predict_batch(df, chunk_size=chunk_size), repeats)
+    out = _throughput(len(df), best)
+    out.update({"mean_seconds": mean, "chunk_size": chunk_size})
+    return out
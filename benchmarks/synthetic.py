@@ -0,0 +1,96 @@
+# benchmarks/synthetic.py
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CITIES_BY_STATE = {
+    "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai"],
+    "Maharashtra": ["Mumbai", "Pune", "Nagpur"],
+    "Karnataka": ["Bangalore", "Mysore", "Mangalore"],
+    "Telangana": ["Hyderabad", "Warangal"],
+    "Delhi": ["New Delhi", "Dwarka"],
+    "West Bengal": ["Kolkata", "Durgapur"],
+}
+AMENITIES = ["Playground", "Gym", "Garden", "Pool", "Clubhouse"]
+
+
+def generate_housing_frame(n_rows, seed=0, missing_rate=0.0, missing_cols=("Size_in_SqFt", "Price_in_Lakhs"),
+                           id_start=1):
+    """Synthetic listings with the india_housing_prices.csv schema.
+
+    City price levels differ so the Option B label has both classes;
+    ``missing_rate`` blanks that fraction of ``missing_cols`` to exercise imputation.
+    """
+    rng = np.random.default_rng(seed)
+    # City price levels come from their own stream so every chunk of a large file shares them
+    city_rng = np.random.default_rng(0)
+    pairs = [(s, c) for s, cities in CITIES_BY_STATE.items() for c in cities]
+    pair_idx = rng.integers(0, len(pairs), n_rows)
+    states = np.array([s for s, _ in pairs], dtype=object)[pair_idx]
+    cities = np.array([c for _, c in pairs], dtype=object)[pair_idx]
+    city_level = city_rng.uniform(0.04, 0.2, len(pairs))[pair_idx]
+
+    size = rng.integers(500, 5000, n_rows)
+    price_per_sqft = np.round(city_level * rng.lognormal(0.0, 0.25, n_rows), 4)
+    price = np.round(price_per_sqft * size, 2)
+    year_built = rng.integers(1990, 2024, n_rows)
+    total_floors = rng.integers(1, 31, n_rows)
+
+    n_amenities = rng.integers(1, len(AMENITIES) + 1, n_rows)
+    shuffled = np.argsort(rng.random((n_rows, len(AMENITIES))), axis=1)
+    amenity_names = np.array(AMENITIES, dtype=object)
+    amenities = [", ".join(amenity_names[row[:k]]) for row, k in zip(shuffled, n_amenities)]
+
+    df = pd.DataFrame({
+        "ID": np.arange(id_start, id_start + n_rows),
+        "State": states,
+        "City": cities,
+        "Locality": np.char.add("Locality_", rng.integers(1, 500, n_rows).astype(str)).astype(object),
+        "Property_Type": rng.choice(["Apartment", "Independent House", "Villa"], n_rows).astype(object),
+        "BHK": rng.integers(1, 6, n_rows),
+        "Size_in_SqFt": size,
+        "Price_in_Lakhs": price,
+        "Price_per_SqFt": price_per_sqft,
+        "Year_Built": year_built,
+        "Furnished_Status": rng.choice(["Furnished", "Unfurnished", "Semi-furnished"], n_rows).astype(object),
+        "Floor_No": rng.integers(0, total_floors + 1),
+        "Total_Floors": total_floors,
+        "Age_of_Property": 2025 - year_built,
+        "Nearby_Schools": rng.integers(1, 11, n_rows),
+        "Nearby_Hospitals": rng.integers(1, 11, n_rows),
+        "Public_Transport_Accessibility": rng.choice(["High", "Medium", "Low"], n_rows).astype(object),
+        "Parking_Space": rng.choice(["Yes", "No"], n_rows).astype(object),
+        "Security": rng.choice(["Yes", "No"], n_rows).astype(object),
+        "Amenities": amenities,
+        "Facing": rng.choice(["East", "West", "North", "South"], n_rows).astype(object),
+        "Owner_Type": rng.choice(["Owner", "Builder", "Broker"], n_rows).astype(object),
+        "Availability_Status": rng.choice(["Ready_to_Move", "Under_Construction"], n_rows).astype(object),
+    })
+    if missing_rate > 0:
+        for col in missing_cols:
+            df[col] = df[col].astype("float64").mask(rng.random(n_rows) < missing_rate)
+    return df
+
+
+def write_housing_csv(path, n_rows, seed=0, chunk_rows=1_000_000, missing_rate=0.0):
+    """Write ``n_rows`` synthetic listings to ``path`` in chunks, so 10M-row files fit in memory."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        n = min(chunk_rows, n_rows - start)
+        chunk = generate_housing_frame(n, seed=seed + i, missing_rate=missing_rate, id_start=start + 1)
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a synthetic india_housing_prices.csv look-alike.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(write_housing_csv(args.out, args.rows, args.seed, missing_rate=args.missing_rate))
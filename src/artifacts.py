@@ -0,0 +1,123 @@
+# src/artifacts.py
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class _Entry:
+    __slots__ = ("path", "fingerprint", "sha256", "value", "loads", "hits",
+                 "cold_load_seconds", "last_load_seconds", "warm_seconds")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fingerprint = None
+        self.sha256 = None
+        self.value = None
+        self.loads = 0
+        self.hits = 0
+        self.cold_load_seconds = None
+        self.last_load_seconds = None
+        self.warm_seconds = 0.0
+
+
+class ArtifactRegistry:
+    """Process-wide cache of deserialized artifacts keyed by file fingerprint.
+
+    Every ``get`` costs one ``stat`` call. When the file's mtime/size changes the
+    content hash is recomputed and the artifact is reloaded only if the bytes
+    actually differ, so dropping a new model file in place hot-reloads it.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+
+    def get(self, name: str, path: Path, loader: Callable[[Path], Any]) -> Any:
+        start = time.perf_counter()
+        path = Path(path)
+        stat = path.stat()
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.path != path:
+                entry = _Entry(path)
+                self._entries[name] = entry
+
+            if entry.fingerprint == fingerprint:
+                entry.hits += 1
+                entry.warm_seconds += time.perf_counter() - start
+                return entry.value
+
+            sha = file_sha256(path)
+            if entry.sha256 == sha:
+                entry.fingerprint = fingerprint
+                entry.hits += 1
+                entry.warm_seconds += time.perf_counter() - start
+                return entry.value
+
+            load_start = time.perf_counter()
+            value = loader(path)
+            elapsed = time.perf_counter() - load_start
+
+            entry.value = value
+            entry.fingerprint = fingerprint
+            entry.sha256 = sha
+            entry.loads += 1
+            entry.last_load_seconds = elapsed
+            if entry.cold_load_seconds is None:
+                entry.cold_load_seconds = elapsed
+            return value
+
+    def put(self, name: str, value: Any, path: Optional[Path] = None) -> Any:
+        with self._lock:
+            entry = _Entry(Path(path) if path is not None else None)
+            entry.value = value
+            entry.loads = 1
+            self._entries[name] = entry
+            return value
+
+    def peek(self, name: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(name)
+            return None if entry is None else entry.value
+
+    def version(self, name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(name)
+            return None if entry is None else entry.sha256
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "path": str(e.path) if e.path is not None else None,
+                    "sha256": e.sha256,
+                    "loads": e.loads,
+                    "hits": e.hits,
+                    "cold_load_seconds": e.cold_load_seconds,
+                    "last_load_seconds": e.last_load_seconds,
+                    "warm_mean_seconds": e.warm_seconds / e.hits if e.hits else None,
+                }
+                for name, e in self._entries.items()
+            }
+
+
+REGISTRY = ArtifactRegistry()
@@ -0,0 +1,101 @@
+# src/city_medians.py
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+FALLBACK_POLICIES = ("state", "global", "zero")
+
+
+class CityMedianTable:
+    """City -> median Price_per_SqFt lookup persisted next to the model.
+
+    Unseen cities resolve according to ``fallback``: the median of the
+    listing's state, the global median, or 0.0.
+    """
+
+    def __init__(self, city_medians: Dict[str, float], state_medians: Optional[Dict[str, float]] = None,
+                 global_median: float = 0.0, fallback: str = "state", metadata: Optional[Dict[str, Any]] = None):
+        if fallback not in FALLBACK_POLICIES:
+            raise ValueError(f"Unknown City_Median fallback policy: {fallback!r}")
+        self.city_medians = {str(k): float(v) for k, v in city_medians.items()}
+        self.state_medians = {str(k): float(v) for k, v in (state_medians or {}).items()}
+        self.global_median = float(global_median)
+        self.fallback = fallback
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fallback: str = "state") -> "CityMedianTable":
+        if "City" not in df.columns or "Price_per_SqFt" not in df.columns:
+            raise ValueError("Required columns missing: City, Price_per_SqFt")
+        city = df.groupby("City", observed=True)["Price_per_SqFt"].median()
+        state = df.groupby("State", observed=True)["Price_per_SqFt"].median() if "State" in df.columns else {}
+        return cls(
+            city.to_dict(),
+            dict(state),
+            float(df["Price_per_SqFt"].median()),
+            fallback=fallback,
+            metadata={"n_rows": int(len(df))},
+        )
+
+    def _fallback_value(self, state: Any = None) -> float:
+        if self.fallback == "state" and state is not None:
+            value = self.state_medians.get(str(state))
+            if value is not None:
+                return value
+        if self.fallback == "zero":
+            return 0.0
+        return self.global_median
+
+    def lookup(self, city: Any, state: Any = None) -> float:
+        value = self.city_medians.get(str(city))
+        if value is None:
+            return self._fallback_value(state)
+        return value
+
+    def map(self, cities: pd.Series, states: Optional[pd.Series] = None) -> pd.Series:
+        out = cities.astype(str).map(self.city_medians).astype("float64")
+        missing = out.isna()
+        if missing.any():
+            if self.fallback == "state" and states is not None:
+                out[missing] = states[missing].astype(str).map(self.state_medians)
+                missing = out.isna()
+            out[missing] = 0.0 if self.fallback == "zero" else self.global_median
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format_version": FORMAT_VERSION,
+            "metadata": self.metadata,
+            "fallback": self.fallback,
+            "global_median": self.global_median,
+            "state_medians": self.state_medians,
+            "city_medians": self.city_medians,
+        }
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        return path
+
+    @classmethod
+    def load(cls, path, fallback: Optional[str] = None) -> "CityMedianTable":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        version = payload.get("format_version")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported city median table version {version!r} in {path}")
+        return cls(
+            payload["city_medians"],
+            payload.get("state_medians", {}),
+            payload.get("global_median", np.nan),
+            fallback=fallback or payload.get("fallback", "state"),
+            metadata=payload.get("metadata"),
+        )
@@ -0,0 +1,141 @@
+# src/compact_model.py
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def _estimators(model) -> List[Any]:
+    if hasattr(model, "estimators_") and hasattr(model, "n_outputs_"):
+        return list(model.estimators_)
+    if hasattr(model, "tree_"):
+        return [model]
+    raise TypeError(f"Cannot export {type(model).__name__}: only sklearn tree classifiers and forests are supported")
+
+
+def is_exportable(model) -> bool:
+    try:
+        estimators = _estimators(model)
+    except TypeError:
+        return False
+    return hasattr(model, "predict_proba") and getattr(model, "n_outputs_", 1) == 1 and len(estimators) > 0
+
+
+class CompactForest:
+    """Flattened node arrays for an sklearn tree ensemble with a NumPy evaluator.
+
+    All trees share one set of arrays (feature, threshold, left, right,
+    missing_go_to_left, value); ``roots`` holds each tree's first node. Leaves
+    point to themselves, so every row can step through ``max_depth`` levels in
+    lock-step. ``predict_proba`` reproduces sklearn's: inputs are compared as
+    float32 and per-tree class fractions are averaged.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_go_to_left, value, roots, max_depth,
+                 classes, feature_names=None, source_sha256=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.source_sha256 = source_sha256
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model, source_sha256: Optional[str] = None) -> "CompactForest":
+        estimators = _estimators(model)
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            idx = np.arange(n, dtype=np.int64) + offset
+            is_leaf = tree.children_left < 0
+            lefts.append(np.where(is_leaf, idx, tree.children_left + offset))
+            rights.append(np.where(is_leaf, idx, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+            go_left = getattr(tree, "missing_go_to_left", None)
+            missing.append(np.zeros(n, dtype=bool) if go_left is None else np.asarray(go_left, dtype=bool))
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(missing), np.concatenate(values), np.asarray(roots, dtype=np.int64), max_depth,
+            np.asarray(model.classes_), getattr(model, "feature_names_in_", None), source_sha256,
+        )
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns") and self.feature_names is not None:
+            X = X[self.feature_names]
+        return np.asarray(X, dtype=np.float32)
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)."""
+        X = self._as_matrix(X)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(x), self.missing_go_to_left[nodes], x <= self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]), dtype=np.float64)
+        for t in range(self.n_trees):
+            proba += self.value[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            format_version=FORMAT_VERSION,
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            missing_go_to_left=self.missing_go_to_left, value=self.value, roots=self.roots,
+            max_depth=self.max_depth, classes=self.classes_,
+            feature_names=np.asarray(self.feature_names if self.feature_names is not None else [], dtype=str),
+            source_sha256=np.asarray(self.source_sha256 or ""),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path) -> "CompactForest":
+        with np.load(path, allow_pickle=False) as f:
+            if int(f["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model version {int(f['format_version'])} in {path}")
+            feature_names = [str(n) for n in f["feature_names"]] or None
+            return cls(
+                f["feature"], f["threshold"], f["left"], f["right"], f["missing_go_to_left"], f["value"],
+                f["roots"], int(f["max_depth"]), f["classes"], feature_names, str(f["source_sha256"]) or None,
+            )
+
+
+def check_parity(model, compact: CompactForest, X) -> float:
+    """Largest absolute predict_proba difference between the sklearn model and its export."""
+    return float(np.max(np.abs(model.predict_proba(X) - compact.predict_proba(X)), initial=0.0))
@@ -1,9 +1,66 @@
+import os
 from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_PATH = PROJECT_ROOT / "data" / "india_housing_prices.csv"
-MODEL_DIR = PROJECT_ROOT / "models"
+# Serving-side artifact directory; REAL_ESTATE_MODEL_DIR points predict/explain at another set (e.g. benchmarks)
+MODEL_DIR = Path(os.environ.get("REAL_ESTATE_MODEL_DIR", PROJECT_ROOT / "models"))
 MLFLOW_EXPERIMENT = "RealEstateInvestment"
 SEED = 42
 DEFAULT_GROWTH_RATE = 0.05
 FUTURE_YEARS = 5
-
+# src/projection.py: per-city annual growth overrides (also read from CITY_GROWTH_RATES_PATH if present),
+# annual volatility of the Monte Carlo simulation and the memory budget of one simulated chunk
+CITY_GROWTH_RATES = {}
+CITY_GROWTH_RATES_PATH = MODEL_DIR / "city_growth_rates.json"
+PROJECTION_VOLATILITY = 0.08
+PROJECTION_CHUNK_MB = 64
+# Policy for cities missing from the persisted City_Median table: "state", "global" or "zero"
+CITY_MEDIAN_FALLBACK = "state"
+# Scoring server (src/serve.py)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_MAX_BATCH_SIZE = 64
+SERVE_MAX_WAIT_MS = 5.0
+# Threads a saved model scores with; a joblib pool per single-row predict_proba costs more than the trees
+SERVE_N_JOBS = 1
+# Declared schema of india_housing_prices.csv; columns not listed here are left to pandas inference
+CATEGORICAL_COLUMNS = [
+    "State", "City", "Locality", "Property_Type", "Furnished_Status",
+    "Public_Transport_Accessibility", "Parking_Space", "Security", "Amenities",
+    "Facing", "Owner_Type", "Availability_Status",
+]
+# Integer columns are nullable (Int32) so a blank cell reads as <NA> instead of failing the whole read
+NUMERIC_DTYPES = {
+    "ID": "Int32", "BHK": "Int32", "Size_in_SqFt": "float32", "Price_in_Lakhs": "float32",
+    "Price_per_SqFt": "float32", "Year_Built": "Int32", "Floor_No": "Int32", "Total_Floors": "Int32",
+    "Age_of_Property": "Int32", "Nearby_Schools": "Int32", "Nearby_Hospitals": "Int32",
+}
+TRAIN_CHUNK_SIZE = 100_000
+# Numeric imputation in build_preprocessing: "iterative", "iterative_sampled", "knn" or "median".
+# The sampled/knn modes fit on at most IMPUTATION_SAMPLE_SIZE rows and then transform every row.
+IMPUTATION_STRATEGY = "iterative"
+IMPUTATION_SAMPLE_SIZE = 20_000
+# Matrix produced by build_preprocessing: "dense" (float64), "float32" (dense float32)
+# or "sparse" (float32 CSR; unstored cells mean 0.0, so not for XGBoost/LightGBM, which read them as missing)
+PREPROCESSING_OUTPUT = "dense"
+# Classifier trained by src/train.py: "rf" (RandomForest), "lightgbm" or "hgb" (HistGradientBoosting)
+MODEL_BACKEND = "rf"
+# Score with models/compact_model.npz (array export of the forest) when it matches the joblib model
+USE_COMPACT_MODEL = True
+# SHAP explanations (src/explain.py): rows kept in the LRU and background rows sampled for interventional SHAP
+EXPLAIN_CACHE_SIZE = 4096
+EXPLAIN_BACKGROUND_SIZE = 100
+# Stage timings from src/tracing.py; REAL_ESTATE_TRACING=0 turns every span into a no-op
+TRACING_ENABLED = os.environ.get("REAL_ESTATE_TRACING", "1") != "0"
+TRACE_EXPORT_PATH = PROJECT_ROOT / "logs" / "trace.json"
+# `python -m src.train --incremental`: "warm_start" adds INCREMENTAL_NEW_TREES trees/boosting rounds fitted on
+# new rows plus the reservoir sample; "reservoir" refits on the sample. The reservoir holds at most
+# INCREMENTAL_RESERVOIR_SIZE encoded rows.
+INCREMENTAL_STRATEGY = "warm_start"
+INCREMENTAL_NEW_TREES = 20
+INCREMENTAL_RESERVOIR_SIZE = 200_000
+# Peer-group price index (src/peer_index.py), rebuilt by every training run. With PEER_FEATURES_ENABLED the
+# model is also trained on Locality_Relative_Price / Peer_Price_Percentile; groups under PEER_MIN_COUNT rows
+# fall back to the next coarser level
+PEER_FEATURES_ENABLED = False
+PEER_MIN_COUNT = 5
@@ -0,0 +1,160 @@
+# src/data_cache.py
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.artifacts import file_sha256
+from src.city_medians import CityMedianTable
+from src.config import CATEGORICAL_COLUMNS, CITY_MEDIAN_FALLBACK, DATA_PATH, NUMERIC_DTYPES
+from src.encoding import EncodingTable
+
+FORMAT_VERSION = 1
+FRAME_FILE = "housing.parquet"
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+MANIFEST_FILE = "manifest.json"
+# Code the cached frame and matrices depend on: CSV dtypes, encode_chunk and Option-B labels, medians, vocabularies
+CACHE_SOURCES = ("train.py", "city_medians.py", "encoding.py")
+
+
+def cache_root(csv_path=DATA_PATH) -> Path:
+    return Path(csv_path).parent / "cache"
+
+
+def csv_hash(csv_path=DATA_PATH) -> str:
+    """Content hash of the CSV, memoised on mtime/size so unchanged files are not re-read."""
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    index_path = cache_root(csv_path) / "index.json"
+    key = str(csv_path.resolve())
+
+    index = {}
+    if index_path.exists():
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    entry = index.get(key)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return entry["sha256"]
+
+    sha = file_sha256(csv_path)
+    index[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return sha
+
+
+def config_key(config: Dict[str, Any], sources=()) -> str:
+    """Short hash of ``config`` and the contents of ``sources`` (file names under src/)."""
+    src_dir = Path(__file__).parent
+    payload = dict(config, code={name: file_sha256(src_dir / name) for name in sources})
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def cache_key(csv_path=DATA_PATH) -> str:
+    """CSV content hash plus a hash of the settings and code that turn it into the cached arrays."""
+    config = {
+        "format_version": FORMAT_VERSION,
+        "dtypes": NUMERIC_DTYPES,
+        "categorical_columns": list(CATEGORICAL_COLUMNS),
+        "city_median_fallback": CITY_MEDIAN_FALLBACK,
+    }
+    return f"{csv_hash(csv_path)[:16]}_{config_key(config, CACHE_SOURCES)}"
+
+
+def cache_dir(csv_path=DATA_PATH) -> Path:
+    return cache_root(csv_path) / cache_key(csv_path)
+
+
+def read_manifest(csv_path=DATA_PATH) -> Optional[Dict[str, Any]]:
+    if not Path(csv_path).exists():
+        return None
+    manifest_path = cache_dir(csv_path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def is_fresh(csv_path=DATA_PATH) -> bool:
+    return read_manifest(csv_path) is not None
+
+
+def build_cache(csv_path=DATA_PATH, force: bool = False) -> Path:
+    """Convert the CSV once into a typed Parquet frame plus a memory-mappable feature matrix."""
+    from src.train import load_training_matrix, read_csv_typed
+
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Dataset not found at {csv_path}")
+    target = cache_dir(csv_path)
+    if not force and is_fresh(csv_path):
+        return target
+    target.mkdir(parents=True, exist_ok=True)
+
+    df = read_csv_typed(csv_path)
+    df.to_parquet(target / FRAME_FILE, index=False)
+    n_rows = len(df)
+    del df
+
+    X, y, city_medians, encoding, _ = load_training_matrix(csv_path, use_cache=False)
+    np.save(target / FEATURES_FILE, X.to_numpy(copy=False))
+    np.save(target / LABELS_FILE, y.to_numpy(copy=False))
+    city_medians.save(target / "city_medians.json")
+    encoding.save(target / "encoding_tables.json")
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "csv_path": str(csv_path),
+        "sha256": csv_hash(csv_path),
+        "cache_key": target.name,
+        "rows": n_rows,
+        "feature_columns": list(X.columns),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # The manifest is written last so a half-built cache never looks fresh.
+    with open(target / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Cached {n_rows} rows from {csv_path} at {target}")
+    return target
+
+
+def load_frame(csv_path=DATA_PATH) -> Optional[pd.DataFrame]:
+    if not is_fresh(csv_path):
+        return None
+    return pd.read_parquet(cache_dir(csv_path) / FRAME_FILE)
+
+
+def load_feature_matrix(csv_path=DATA_PATH):
+    """Memory-mapped ``(X, y, city_medians, encoding, stats)`` from a fresh cache, else None."""
+    manifest = read_manifest(csv_path)
+    if manifest is None:
+        return None
+    target = cache_dir(csv_path)
+    X = np.load(target / FEATURES_FILE, mmap_mode="r")
+    y = np.load(target / LABELS_FILE, mmap_mode="r")
+    stats = {"rows": manifest["rows"], "matrix_mb": X.nbytes / (1024 * 1024), "peak_rss_mb": None,
+             "cache": str(target)}
+    return (pd.DataFrame(X, columns=manifest["feature_columns"], copy=False),
+            pd.Series(y, name="Good_Investment", copy=False),
+            CityMedianTable.load(target / "city_medians.json"),
+            EncodingTable.load(target / "encoding_tables.json"),
+            stats)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the columnar cache for the housing CSV.")
+    parser.add_argument("--csv", type=Path, default=DATA_PATH)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if a fresh cache exists")
+    args = parser.parse_args()
+    build_cache(args.csv, force=args.force)
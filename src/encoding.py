@@ -0,0 +1,88 @@
+# src/encoding.py
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+UNKNOWN_CODE = -1
+# Below this many values a plain dict lookup beats building a hash index.
+_SMALL_BATCH = 16
+
+
+class EncodingTable:
+    """Precompiled categorical vocabularies exported from training.
+
+    Codes match ``LabelEncoder`` (position in the sorted class list) for every
+    label seen at fit time; anything else maps to ``UNKNOWN_CODE``. Labels
+    added later by ``extend`` are appended, so existing codes never move.
+    Single values are a dict lookup; whole columns go through a hashed ``pd.Index``.
+    """
+
+    def __init__(self, vocabularies: Dict[str, Iterable[Any]]):
+        self.vocabularies: Dict[str, List[str]] = {
+            col: [str(v) for v in values] for col, values in vocabularies.items()
+        }
+        self._lookup = {
+            col: {v: i for i, v in enumerate(values)} for col, values in self.vocabularies.items()
+        }
+        self._index = {col: pd.Index(values, dtype=object) for col, values in self.vocabularies.items()}
+
+    @classmethod
+    def from_label_encoders(cls, encoders: Dict[str, Any]) -> "EncodingTable":
+        return cls({col: list(le.classes_) for col, le in encoders.items()})
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.vocabularies)
+
+    def encode_value(self, col: str, value: Any) -> int:
+        return self._lookup[col].get(str(value), UNKNOWN_CODE)
+
+    def encode_column(self, col: str, values: pd.Series) -> np.ndarray:
+        as_str = values.astype(str)
+        if len(as_str) <= _SMALL_BATCH:
+            lookup = self._lookup[col]
+            return np.array([lookup.get(v, UNKNOWN_CODE) for v in as_str], dtype=np.int64)
+        return self._index[col].get_indexer(as_str).astype(np.int64)
+
+    def extend(self, df: pd.DataFrame) -> Tuple["EncodingTable", Dict[str, int]]:
+        """Copy of the table with labels from ``df`` not seen so far appended, plus counts added per column."""
+        vocabularies = {col: list(values) for col, values in self.vocabularies.items()}
+        added = {}
+        for col, values in vocabularies.items():
+            if col not in df.columns:
+                continue
+            lookup = self._lookup[col]
+            new = sorted(v for v in pd.unique(df[col].astype(str)) if v not in lookup)
+            if new:
+                values.extend(new)
+                added[col] = len(new)
+        return EncodingTable(vocabularies), added
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        encoded = {col: self.encode_column(col, df[col]) for col in self.vocabularies if col in df.columns}
+        return df.assign(**encoded) if encoded else df
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "format_version": FORMAT_VERSION,
+            "unknown_code": UNKNOWN_CODE,
+            "vocabularies": self.vocabularies,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path) -> "EncodingTable":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        version = payload.get("format_version")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported encoding table version {version!r} in {path}")
+        return cls(payload["vocabularies"])
@@ -1,18 +1,175 @@
 # src/explain.py
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
 import joblib
-import shap
+import numpy as np
 import pandas as pd
-from src.config import MODEL_DIR
+import scipy.sparse as sp
+
+from src.artifacts import REGISTRY
+from src.config import EXPLAIN_BACKGROUND_SIZE, EXPLAIN_CACHE_SIZE, MODEL_DIR, SEED
+from src.tracing import incr, span
+
+MODEL_FILES = {
+    "preprocessor": MODEL_DIR / "preprocessor.joblib",
+    "regressor": MODEL_DIR / "regressor.joblib",
+    "classifier": MODEL_DIR / "classifier.joblib",
+}
+
+
+def _load(name: str) -> Any:
+    with span("explain.load_model"):
+        return REGISTRY.get(name, MODEL_FILES[name], joblib.load)
+
 
 def load_models():
-    preproc = joblib.load(MODEL_DIR / "preprocessor.joblib")
-    reg = joblib.load(MODEL_DIR / "regressor.joblib")
-    clf = joblib.load(MODEL_DIR / "classifier.joblib")
-    return preproc, reg, clf
+    return _load("preprocessor"), _load("regressor"), _load("classifier")
+
+
+class ExplanationCache:
+    """LRU of per-row SHAP values keyed by model version and a hash of the transformed row."""
+
+    def __init__(self, maxsize: int = EXPLAIN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._rows: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def row_key(row: np.ndarray) -> str:
+        return hashlib.blake2b(np.ascontiguousarray(row, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+    def get(self, key: Tuple[str, str]):
+        with self._lock:
+            value = self._rows.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[str, str], value) -> None:
+        with self._lock:
+            self._rows[key] = value
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.maxsize:
+                self._rows.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._rows), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+EXPLANATIONS = ExplanationCache()
+_explainers: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+_explainers_lock = threading.Lock()
+
+
+def _dense(Xt) -> np.ndarray:
+    return np.asarray(Xt.toarray() if sp.issparse(Xt) else Xt, dtype=np.float64)
+
+
+def sample_background(Xt, size: int = EXPLAIN_BACKGROUND_SIZE, seed: int = SEED) -> np.ndarray:
+    """At most ``size`` rows of an already transformed matrix, drawn without replacement."""
+    Xt = _dense(Xt)
+    if len(Xt) <= size:
+        return Xt
+    rng = np.random.default_rng(seed)
+    return Xt[np.sort(rng.choice(len(Xt), size, replace=False))]
+
+
+def get_explainer(model_name: str = "regressor", background=None) -> Any:
+    """``(shap.TreeExplainer, cache key)`` for the current version of ``model_name``, built once per version.
+
+    Without ``background`` the explainer uses the trees' own cover statistics
+    (path-dependent); with it, SHAP values are interventional against those rows,
+    so pass a small sample (see ``sample_background``).
+    """
+    model = _load(model_name)
+    bg_key = None if background is None else ExplanationCache.row_key(_dense(background).ravel())
+    key = (model_name, REGISTRY.version(model_name), bg_key)
+    with _explainers_lock:
+        explainer = _explainers.get(key)
+        if explainer is None:
+            for stale in [k for k in _explainers if k[0] == model_name and k[1] != key[1]]:
+                del _explainers[stale]
+            import shap
+
+            data = None if background is None else _dense(background)
+            with span("explain.build_explainer"):
+                explainer = shap.TreeExplainer(model, data=data)
+            _explainers[key] = explainer
+    return explainer, key
+
+
+def explain_transformed(Xt, model_name: str = "regressor", background=None, use_cache: bool = True):
+    """SHAP values for rows that already went through the preprocessor, in one explainer call.
+
+    Rows seen before (same model version, background and values) are served
+    from ``EXPLANATIONS`` and only the rest are sent to SHAP.
+    """
+    explainer, key = get_explainer(model_name, background)
+    version = f"{key[0]}:{key[1]}:{key[2]}"
+    X = _dense(Xt)
+    row_keys = [ExplanationCache.row_key(row) for row in X]
+
+    values: list = [None] * len(X)
+    base_values: list = [None] * len(X)
+    missing = []
+    for i, row_key in enumerate(row_keys):
+        cached = EXPLANATIONS.get((version, row_key)) if use_cache else None
+        if cached is None:
+            missing.append(i)
+        else:
+            values[i], base_values[i] = cached
+
+    incr("explain.rows", len(X))
+    incr("explain.cache_hits", len(X) - len(missing))
+    if missing:
+        with span("explain.shap_values"):
+            computed = explainer(X[missing], check_additivity=False)
+        for j, i in enumerate(missing):
+            values[i], base_values[i] = computed.values[j], computed.base_values[j]
+            if use_cache:
+                EXPLANATIONS.put((version, row_keys[i]), (values[i], base_values[i]))
+
+    import shap
+
+    feature_names = getattr(_load("preprocessor"), "get_feature_names_out", None)
+    try:
+        feature_names = list(feature_names()) if feature_names is not None else None
+    except Exception:
+        feature_names = None
+    return shap.Explanation(
+        values=np.stack(values) if values else np.empty((0, X.shape[1])),
+        base_values=np.asarray(base_values),
+        data=X,
+        feature_names=feature_names,
+    )
+
+
+def explain_batch(X: pd.DataFrame, model_name: str = "regressor", background: Optional[pd.DataFrame] = None,
+                  background_size: int = EXPLAIN_BACKGROUND_SIZE, use_cache: bool = True):
+    """Transform ``X`` once and explain every row; ``background`` raw rows are subsampled to ``background_size``."""
+    preproc = _load("preprocessor")
+    with span("explain.transform"):
+        Xt = preproc.transform(X)
+    bg = None
+    if background is not None:
+        if len(background) > background_size:
+            background = background.sample(n=background_size, random_state=SEED).sort_index()
+        bg = preproc.transform(background)
+    return explain_transformed(Xt, model_name, bg, use_cache), Xt
+
 
 def get_shap_explanation(X_sample):
-    preproc, reg, clf = load_models()
-    Xt = preproc.transform(X_sample)
-    explainer = shap.Explainer(reg)
-    shap_values = explainer(Xt)
-    return shap_values, Xt
+    return explain_batch(X_sample, "regressor")
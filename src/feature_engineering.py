@@ -2,13 +2,84 @@
 import numpy as np
 import pandas as pd
 
-def compute_investment_score(df):
+TRANSPORT_SCORES = {"Low": 0, "Medium": 0.5, "High": 1}
+
+
+def price_per_sqft(price, size):
+    """Price_per_SqFt in the training CSV's unit (lakhs per square foot); NaN where size is not positive."""
+    price = np.asarray(price, dtype=np.float64)
+    size = np.asarray(size, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(size > 0, price / size, np.nan)
+
+
+def amenity_counts(df):
+    """Number of comma-separated amenities per row, and the count used for the normaliser.
+
+    A missing value scores 0 but, as ``str(nan)`` is one token, counts as 1
+    towards the maximum.
+    """
+    if "Amenities_Count" in df.columns:
+        counts = df["Amenities_Count"].astype("float64")
+        return counts.fillna(0), counts.fillna(1)
+    amenities = df["Amenities"]
+    tokens = amenities.astype(str).str.count(",").astype("float64") + 1
+    return tokens.where(amenities.notna(), 0.0), tokens
+
+
+class InvestmentScoreStats:
+    """Normalisation maxima for ``compute_investment_score``.
+
+    Fit once on the full data (or accumulate with ``partial_fit`` over chunks)
+    and reuse it so scores for chunks or new listings match a global run.
+    """
+
+    def __init__(self, pps_max=None, age_max=None, amenities_max=None):
+        self.pps_max = pps_max
+        self.age_max = age_max
+        self.amenities_max = amenities_max
+
+    def partial_fit(self, df):
+        _, for_max = amenity_counts(df)
+        updates = {
+            "pps_max": df["Price_per_SqFt"].max(),
+            "age_max": df["Age_of_Property"].max(),
+            "amenities_max": for_max.max(),
+        }
+        for name, value in updates.items():
+            if pd.isna(value):
+                continue
+            current = getattr(self, name)
+            setattr(self, name, float(value) if current is None else max(current, float(value)))
+        return self
+
+    def fit(self, df):
+        self.pps_max = self.age_max = self.amenities_max = None
+        return self.partial_fit(df)
+
+    def to_dict(self):
+        return {"pps_max": self.pps_max, "age_max": self.age_max, "amenities_max": self.amenities_max}
+
+
+def compute_investment_score(df, stats=None):
     df = df.copy()
-    signals = {}
-    signals['cheap_pps'] = (df['Price_per_SqFt'].max() - df['Price_per_SqFt']) / (df['Price_per_SqFt'].max())
-    signals['age_score'] = 1 - (df['Age_of_Property'] / (1 + df['Age_of_Property'].max()))
-    signals['amenities'] = df['Amenities'].apply(lambda x: len(str(x).split(",")) if pd.notna(x) else 0) / (1 + df['Amenities'].map(lambda x: len(str(x).split(","))).max())
-    signals['public_transport'] = df['Public_Transport_Accessibility'].map({"Low":0, "Medium":0.5, "High":1}).fillna(0.5)
-    df['investment_score'] = 0.4 * signals['cheap_pps'] + 0.2 * signals['age_score'] + 0.2 * signals['amenities'] + 0.2 * signals['public_transport']
-    df['investment_score'] = df['investment_score'].clip(0,1)
+    if stats is None:
+        stats = InvestmentScoreStats().fit(df)
+    amenities, _ = amenity_counts(df)
+    pps_max = np.nan if stats.pps_max is None else stats.pps_max
+    age_max = np.nan if stats.age_max is None else stats.age_max
+    amenities_max = np.nan if stats.amenities_max is None else stats.amenities_max
+
+    cheap_pps = (pps_max - df['Price_per_SqFt']) / pps_max
+    age_score = 1 - (df['Age_of_Property'] / (1 + age_max))
+    amenities_score = amenities / (1 + amenities_max)
+    public_transport = df['Public_Transport_Accessibility'].map(TRANSPORT_SCORES).astype("float64").fillna(0.5)
+    df['investment_score'] = 0.4 * cheap_pps + 0.2 * age_score + 0.2 * amenities_score + 0.2 * public_transport
+    df['investment_score'] = df['investment_score'].clip(0, 1)
     return df
+
+
+def iter_investment_scores(chunks, stats):
+    """Score an iterable of DataFrame chunks with fixed statistics."""
+    for chunk in chunks:
+        yield compute_investment_score(chunk, stats)
@@ -0,0 +1,341 @@
+# src/incremental.py
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.city_medians import CityMedianTable
+from src.config import (CITY_MEDIAN_FALLBACK, INCREMENTAL_NEW_TREES, INCREMENTAL_RESERVOIR_SIZE,
+                        INCREMENTAL_STRATEGY, SEED, TRAIN_CHUNK_SIZE)
+from src.encoding import EncodingTable
+from src.model_index import DEFAULT_EXPERIMENT
+from src.peer_index import PEER_FEATURES
+from src.tracing import span, traced
+from src.train import (CITY_MEDIANS_PATH, DATA_PATH, ENCODING_TABLE_PATH, MODEL_PATH, build_model, csv_dtypes,
+                       encode_chunk, export_compact_model, for_serving, native_categorical_columns, option_b_labels,
+                       _fit_params)
+
+STATE_DIR = "models/incremental"
+STRATEGIES = ("warm_start", "reservoir")
+_ALL = "__all__"
+# Bytes before the saved offset that must be unchanged for the CSV to count as only appended to
+FINGERPRINT_BYTES = 4096
+# Incremental updates are scored on a slice of the new rows, not the full runs' test split, so they are
+# logged and indexed under their own metric/experiment and never compete with full runs for "best"
+HOLDOUT_METRIC = "new_rows_holdout_accuracy"
+INDEX_EXPERIMENT = f"{DEFAULT_EXPERIMENT}_incremental"
+
+
+class IncrementalState:
+    """What incremental retraining needs to carry between runs.
+
+    * ``watermark``: highest listing ID already trained on, plus the byte offset
+      where the CSV ended, so appended rows can be read without re-parsing the file.
+    * ``prices``: every Price_per_SqFt seen, grouped by City and State, so
+      medians are updated exactly by touching only the groups new rows fall in.
+    * ``reservoir``: a uniform sample (Algorithm R) of encoded training rows
+      that new trees or a reservoir refit see alongside the new rows.
+    """
+
+    def __init__(self, meta: Dict[str, Any], prices: Dict[str, np.ndarray], reservoir_X: np.ndarray,
+                 reservoir_y: np.ndarray):
+        self.meta = meta
+        self.prices = prices
+        self.reservoir_X = reservoir_X
+        self.reservoir_y = reservoir_y
+
+    @classmethod
+    def from_training(cls, X: pd.DataFrame, y: pd.Series, encoding: EncodingTable, csv_path, backend: str,
+                      full_fit_seconds: float, reservoir_size: int = INCREMENTAL_RESERVOIR_SIZE) -> "IncrementalState":
+        pps = X["Price_per_SqFt"].to_numpy(np.float32)
+        prices = {_ALL: pps.copy()}
+        for col in ("City", "State"):
+            if col not in X.columns:
+                continue
+            codes = X[col].to_numpy().astype(np.int64)
+            labels = encoding.vocabularies[col]
+            for code in np.unique(codes):
+                name = labels[code] if 0 <= code < len(labels) else str(code)
+                prices[f"{col}={name}"] = pps[codes == code]
+
+        rng = np.random.default_rng(SEED)
+        n = len(X)
+        keep = np.arange(n) if n <= reservoir_size else np.sort(rng.choice(n, reservoir_size, replace=False))
+        offset = _csv_end_offset(csv_path)
+        meta = {
+            "columns": [c for c in X.columns if c != "City_Median" and c not in PEER_FEATURES],
+            "peer_features": [c for c in PEER_FEATURES if c in X.columns],
+            "watermark": int(X["ID"].max()) if "ID" in X.columns and n else None,
+            "byte_offset": offset,
+            "prefix_sha256": _prefix_fingerprint(csv_path, offset),
+            "rows_seen": n,
+            "reservoir_size": reservoir_size,
+            "backend": backend,
+            "full_fit_seconds": full_fit_seconds,
+            "full_fit_rows": n,
+            "updates": 0,
+        }
+        return cls(meta, prices, X.to_numpy(np.float32)[keep], y.to_numpy(np.int8)[keep])
+
+    def save(self, state_dir=STATE_DIR) -> Path:
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        np.savez(state_dir / "prices.npz", **self.prices)
+        np.savez(state_dir / "reservoir.npz", X=self.reservoir_X, y=self.reservoir_y)
+        # Written last so an interrupted save leaves the previous state readable
+        with open(state_dir / "state.json", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+        return state_dir
+
+    @classmethod
+    def load(cls, state_dir=STATE_DIR) -> "IncrementalState":
+        state_dir = Path(state_dir)
+        if not (state_dir / "state.json").exists():
+            raise FileNotFoundError(f"No incremental state in {state_dir}; run a full `python -m src.train` first")
+        with open(state_dir / "state.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(state_dir / "prices.npz") as f:
+            prices = {k: f[k] for k in f.files}
+        with np.load(state_dir / "reservoir.npz") as f:
+            return cls(meta, prices, f["X"], f["y"])
+
+    def update_medians(self, new_rows: pd.DataFrame, city_medians: CityMedianTable) -> CityMedianTable:
+        """Append new prices and recompute only the medians of groups they touch."""
+        pps = new_rows["Price_per_SqFt"].to_numpy(np.float32)
+        self.prices[_ALL] = np.concatenate([self.prices[_ALL], pps])
+        city = dict(city_medians.city_medians)
+        state = dict(city_medians.state_medians)
+        for col, target in (("City", city), ("State", state)):
+            if col not in new_rows.columns:
+                continue
+            names = new_rows[col].astype(str).to_numpy()
+            for name in np.unique(names):
+                key = f"{col}={name}"
+                values = np.concatenate([self.prices.get(key, np.empty(0, np.float32)), pps[names == name]])
+                self.prices[key] = values
+                target[name] = float(np.nanmedian(values))
+        metadata = dict(city_medians.metadata, n_rows=int(len(self.prices[_ALL])))
+        metadata.pop("created_at", None)
+        return CityMedianTable(city, state, float(np.nanmedian(self.prices[_ALL])), fallback=city_medians.fallback,
+                               metadata=metadata)
+
+    def relabel_reservoir(self, encoding: EncodingTable, city_medians: CityMedianTable) -> int:
+        """Refresh the reservoir's City_Median column and Option B labels from updated medians.
+
+        Returns how many labels flipped. Reservoir rows use the layout of
+        ``encode_chunk``: ``meta["columns"]`` followed by City_Median.
+        """
+        if not len(self.reservoir_y):
+            return 0
+        columns = self.meta["columns"]
+        codes = self.reservoir_X[:, columns.index("City")].astype(np.int64)
+        vocab = np.asarray(encoding.vocabularies["City"], dtype=object)
+        known = (codes >= 0) & (codes < len(vocab))
+        cities = pd.Series(np.where(known, vocab[np.where(known, codes, 0)], None))
+        median = city_medians.map(cities).to_numpy(np.float32)
+        labels = option_b_labels(self.reservoir_X[:, columns.index("Price_per_SqFt")], median).astype(np.int8)
+        flipped = int((labels != self.reservoir_y).sum())
+        self.reservoir_X[:, len(columns)] = median
+        self.reservoir_y = labels
+        return flipped
+
+    def update_reservoir(self, X_new: np.ndarray, y_new: np.ndarray) -> None:
+        """Algorithm R over the new rows: row t of the stream replaces a random slot with probability k/t."""
+        k = self.meta["reservoir_size"]
+        seen = self.meta["rows_seen"]
+        rng = np.random.default_rng(SEED + self.meta["updates"] + 1)
+        if len(self.reservoir_y) < k:
+            room = min(k - len(self.reservoir_y), len(X_new))
+            self.reservoir_X = np.concatenate([self.reservoir_X, X_new[:room]])
+            self.reservoir_y = np.concatenate([self.reservoir_y, y_new[:room]])
+            X_new, y_new, seen = X_new[room:], y_new[room:], seen + room
+        if len(X_new):
+            slots = rng.integers(0, seen + np.arange(1, len(X_new) + 1))
+            accepted = slots < k
+            self.reservoir_X[slots[accepted]] = X_new[accepted]
+            self.reservoir_y[slots[accepted]] = y_new[accepted]
+
+
+def _csv_end_offset(path) -> Optional[int]:
+    """File size if the CSV ends in a newline, i.e. appended rows would start exactly there."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(max(size - 1, 0))
+        return size if f.read(1) == b"\n" else None
+
+
+def _prefix_fingerprint(path, offset: Optional[int]) -> Optional[str]:
+    """sha256 of the ``FINGERPRINT_BYTES`` bytes ending at ``offset``."""
+    if offset is None or os.path.getsize(path) < offset:
+        return None
+    start = max(offset - FINGERPRINT_BYTES, 0)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+@traced("incremental.read_new_rows")
+def read_new_rows(path, state: IncrementalState, chunksize: int = TRAIN_CHUNK_SIZE) -> Tuple[pd.DataFrame, str]:
+    """Rows with ID above the watermark; seeks past already-seen bytes when the file was only appended to.
+
+    Append mode requires the bytes just before the saved offset to hash as
+    they did last run; any other rewrite of the file falls back to a rescan.
+    """
+    columns = state.meta["columns"]
+    offset = state.meta.get("byte_offset")
+    watermark = state.meta.get("watermark")
+    header = list(pd.read_csv(path, nrows=0).columns)
+    if header != columns:
+        raise ValueError(f"CSV columns changed since the last full training run: {header} != {columns}")
+
+    fingerprint = state.meta.get("prefix_sha256")
+    if offset is not None and fingerprint is not None and _prefix_fingerprint(path, offset) == fingerprint:
+        mode = "append"
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunks = list(pd.read_csv(f, header=None, names=columns, dtype=csv_dtypes(columns),
+                                      chunksize=chunksize)) if os.path.getsize(path) > offset else []
+    else:
+        mode = "rescan"
+        chunks = list(pd.read_csv(path, dtype=csv_dtypes(columns), chunksize=chunksize))
+
+    if watermark is not None:
+        chunks = [c[(c["ID"] > watermark).fillna(False).to_numpy(bool)] for c in chunks]
+    chunks = [c for c in chunks if len(c)]
+    new_rows = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+    return new_rows, mode
+
+
+def _update_model(model, strategy: str, backend: str, X_fit: pd.DataFrame, y_fit: pd.Series, new_trees: int):
+    if strategy == "reservoir":
+        categorical_columns = native_categorical_columns(X_fit) if backend in ("lightgbm", "hgb") else []
+        fresh = build_model(backend, categorical_columns)
+        return fresh.fit(X_fit, y_fit, **_fit_params(backend, categorical_columns))
+
+    if backend == "rf":
+        # Only the added trees are fitted; the existing ones are kept as they are
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees, n_jobs=-1)
+        model.fit(X_fit, y_fit)
+        model.set_params(warm_start=False)
+        return model
+    if backend == "hgb":
+        model.set_params(warm_start=True, max_iter=model.n_iter_ + new_trees)
+        model.fit(X_fit, y_fit)
+        model.set_params(warm_start=False)
+        return model
+    if backend == "lightgbm":
+        from lightgbm import LGBMClassifier
+
+        params = dict(model.get_params(), n_estimators=new_trees, n_jobs=-1)
+        return LGBMClassifier(**params).fit(X_fit, y_fit, init_model=model.booster_,
+                                            **_fit_params(backend, native_categorical_columns(X_fit)))
+    raise ValueError(f"Warm start is not supported for backend {backend!r}; use strategy='reservoir'")
+
+
+def retrain_incremental(path=DATA_PATH, strategy: Optional[str] = None, new_trees: Optional[int] = None,
+                        state_dir=STATE_DIR) -> Optional[Any]:
+    """Fold rows appended to the CSV since the last run into the saved model.
+
+    ``warm_start`` adds ``new_trees`` trees (RF) or boosting iterations
+    (HistGradientBoosting, LightGBM) fitted on the new rows plus the reservoir
+    sample; ``reservoir`` refits a fresh model on that sample alone. Medians
+    and vocabularies are updated in place of a full rescan, the reservoir is
+    relabelled against the new medians, and the time taken is logged to MLflow
+    next to a full refit's, extrapolated from the last one. Models trained with
+    peer features need a full run.
+    """
+    from src.model_index import MODEL_NAME
+    from src.train import configure_mlflow, index_logged_model
+
+    strategy = strategy or INCREMENTAL_STRATEGY
+    new_trees = new_trees or INCREMENTAL_NEW_TREES
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown incremental strategy {strategy!r}; expected one of {STRATEGIES}")
+
+    start = time.perf_counter()
+    state = IncrementalState.load(state_dir)
+    if state.meta.get("peer_features"):
+        # Peer quantiles need every row's price, which only a full scan has; a stale peer index
+        # would silently drift from the medians and labels updated here
+        raise ValueError(f"Incremental retraining cannot refresh models/peer_index.npz for a model trained with "
+                         f"{state.meta['peer_features']}; run a full `python -m src.train --peer-features`")
+    new_rows, read_mode = read_new_rows(path, state)
+    if new_rows.empty:
+        print(f"No rows above watermark ID {state.meta['watermark']}; model unchanged")
+        return None
+
+    backend = state.meta["backend"]
+    model = joblib.load(MODEL_PATH)
+    encoding, added = EncodingTable.load(ENCODING_TABLE_PATH).extend(new_rows)
+    city_medians = state.update_medians(new_rows, CityMedianTable.load(CITY_MEDIANS_PATH, fallback=CITY_MEDIAN_FALLBACK))
+    columns = state.meta["columns"]
+    X_new, y_new = encode_chunk(new_rows, columns, encoding, city_medians)
+    feature_columns = columns + ["City_Median"]
+    # Older reservoir rows carry the medians and labels of earlier runs; refit on ones consistent with the new rows
+    relabeled = state.relabel_reservoir(encoding, city_medians)
+
+    # Hold out a fifth of the new rows to score the updated model on fresh data
+    rng = np.random.default_rng(SEED)
+    holdout = rng.random(len(X_new)) < 0.2 if len(X_new) >= 50 else np.zeros(len(X_new), dtype=bool)
+    X_fit = pd.DataFrame(np.concatenate([X_new[~holdout], state.reservoir_X]), columns=feature_columns)
+    y_fit = pd.Series(np.concatenate([y_new[~holdout], state.reservoir_y]), name="Good_Investment")
+    if y_fit.nunique() < 2:
+        raise ValueError("New rows plus reservoir contain a single class; cannot update the classifier")
+
+    with span("incremental.fit"):
+        fit_start = time.perf_counter()
+        model = for_serving(_update_model(model, strategy, backend, X_fit, y_fit, new_trees))
+        fit_seconds = time.perf_counter() - fit_start
+
+    accuracy = None
+    if holdout.any():
+        X_eval = pd.DataFrame(X_new[holdout], columns=feature_columns)
+        accuracy = float((model.predict(X_eval) == y_new[holdout]).mean())
+
+    state.update_reservoir(X_new, y_new)
+    state.meta["rows_seen"] += len(X_new)
+    state.meta["watermark"] = int(max(state.meta["watermark"] or 0, new_rows["ID"].max()))
+    state.meta["byte_offset"] = _csv_end_offset(path)
+    state.meta["prefix_sha256"] = _prefix_fingerprint(path, state.meta["byte_offset"])
+    state.meta["updates"] += 1
+
+    os.makedirs("models", exist_ok=True)
+    encoding.save(ENCODING_TABLE_PATH)
+    city_medians.save(CITY_MEDIANS_PATH)
+    joblib.dump(model, MODEL_PATH)
+    export_compact_model(model, X_fit.head(1000))
+    state.save(state_dir)
+    elapsed = time.perf_counter() - start
+
+    full_estimate = state.meta["full_fit_seconds"] * state.meta["rows_seen"] / max(state.meta["full_fit_rows"], 1)
+    print(f"Incremental {strategy}: {len(new_rows)} new rows ({read_mode}) in {elapsed:.1f}s; "
+          f"full refit estimated at {full_estimate:.1f}s")
+
+    mlflow = configure_mlflow()
+    with mlflow.start_run():
+        mlflow.log_params({"mode": "incremental", "strategy": strategy, "backend": backend,
+                           "new_trees": new_trees, "read_mode": read_mode})
+        metrics = {
+            "new_rows": len(new_rows),
+            "rows_seen": state.meta["rows_seen"],
+            "new_labels": sum(added.values()),
+            "reservoir_labels_flipped": relabeled,
+            "fit_seconds": fit_seconds,
+            "incremental_seconds": elapsed,
+            "full_refit_estimate_seconds": full_estimate,
+            "time_saved_seconds": full_estimate - elapsed,
+        }
+        if accuracy is not None:
+            metrics[HOLDOUT_METRIC] = accuracy
+        mlflow.log_metrics(metrics)
+        info = mlflow.sklearn.log_model(model, MODEL_NAME)
+        if accuracy is not None:
+            index_logged_model(info, accuracy, backend, experiment=INDEX_EXPERIMENT, metric=HOLDOUT_METRIC,
+                               feature_columns=feature_columns)
+    return model
@@ -0,0 +1,302 @@
+# src/model_index.py
+import hashlib
+import json
+import os
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.artifacts import file_sha256
+from src.config import MODEL_DIR, PROJECT_ROOT
+
+FORMAT_VERSION = 1
+INDEX_PATH = MODEL_DIR / "model_index.json"
+MLFLOW_RUNS_DIR = PROJECT_ROOT / "mlruns"
+DEFAULT_EXPERIMENT = "real_estate_investment_model"
+MODEL_NAME = "rf_investment_model"
+DEFAULT_METRIC = "accuracy"
+# Written by every training run next to the model; an indexed model only scores correctly with its own copies
+PREPROCESSING_ARTIFACTS = ("encoding_tables.json", "city_medians.json", "peer_index.npz")
+
+
+def artifact_sha256(model_dir) -> str:
+    """Content hash over every file of an MLflow model directory (names and bytes)."""
+    model_dir = Path(model_dir)
+    h = hashlib.sha256()
+    for path in sorted(p for p in model_dir.rglob("*") if p.is_file()):
+        h.update(path.relative_to(model_dir).as_posix().encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def preprocessing_fingerprint(model_dir=MODEL_DIR) -> Dict[str, Optional[str]]:
+    """sha256 of each ``PREPROCESSING_ARTIFACTS`` file in ``model_dir`` (None if absent)."""
+    model_dir = Path(model_dir)
+    return {name: file_sha256(model_dir / name) if (model_dir / name).exists() else None
+            for name in PREPROCESSING_ARTIFACTS}
+
+
+def has_model_file(model_dir) -> bool:
+    """Whether ``model_dir`` holds an MLmodel file and the pickled sklearn model it names."""
+    model_dir = Path(model_dir)
+    if not (model_dir / "MLmodel").is_file():
+        return False
+    flavor = (_read_yaml(model_dir / "MLmodel").get("flavors") or {}).get("sklearn") or {}
+    return (model_dir / flavor.get("pickled_model", "model.pkl")).is_file()
+
+
+def _empty_index() -> Dict[str, Any]:
+    return {"format_version": FORMAT_VERSION, "experiments": {}}
+
+
+def load_index(path=INDEX_PATH) -> Dict[str, Any]:
+    path = Path(path)
+    if not path.exists():
+        return _empty_index()
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    version = index.get("format_version")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model index version {version!r} in {path}")
+    return index
+
+
+def save_index(index: Dict[str, Any], path=INDEX_PATH) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def _project_root(index_path) -> Path:
+    # The index lives in <project>/models/, and local paths in it are relative to <project>
+    return Path(index_path).resolve().parent.parent
+
+
+def make_entry(run_id: str, model_uri: str, local_path, metric_value: Optional[float],
+               model_id: Optional[str] = None, backend: Optional[str] = None,
+               index_path=INDEX_PATH, logged_at: Optional[str] = None,
+               feature_columns: Optional[List[str]] = None,
+               artifacts: Optional[Mapping[str, Optional[str]]] = None) -> Dict[str, Any]:
+    """Index entry for a logged model.
+
+    ``feature_columns`` and ``artifacts`` (a ``preprocessing_fingerprint``)
+    record what the model was trained with; ``select`` refuses to serve an
+    entry whose record does not match the files currently in models/.
+    """
+    local_path = Path(local_path).resolve() if local_path is not None else None
+    sha = artifact_sha256(local_path) if local_path is not None and local_path.exists() else None
+    if local_path is not None:
+        root = _project_root(index_path)
+        local_path = local_path.relative_to(root) if local_path.is_relative_to(root) else local_path
+    return {
+        "run_id": run_id,
+        "model_id": model_id,
+        "model_uri": model_uri,
+        "local_path": local_path.as_posix() if local_path is not None else None,
+        "metric": metric_value,
+        "sha256": sha,
+        "backend": backend,
+        "feature_columns": list(feature_columns) if feature_columns is not None else None,
+        "artifacts": dict(artifacts) if artifacts is not None else None,
+        "logged_at": logged_at or datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _is_better(candidate: Optional[float], current: Optional[float], greater_is_better: bool) -> bool:
+    if candidate is None:
+        return current is None
+    if current is None:
+        return True
+    return candidate > current if greater_is_better else candidate < current
+
+
+def _add_entry(index: Dict[str, Any], experiment: str, entry: Dict[str, Any],
+               metric: str, greater_is_better: bool, path=INDEX_PATH) -> Dict[str, Any]:
+    exp = index["experiments"].setdefault(experiment, {
+        "metric": metric, "greater_is_better": greater_is_better,
+        "latest": None, "best": None, "pinned": None, "runs": {},
+    })
+    local = entry_local_path(entry, path)
+    if local is not None and not has_model_file(local):
+        # e.g. an artifact_location recorded on another machine, or a model dir without model.pkl
+        warnings.warn(f"Not indexing {entry['model_uri']}: no MLmodel/pickled model under {entry['local_path']}")
+        return exp
+    exp["runs"][entry["run_id"]] = entry
+    exp["latest"] = entry
+    best = exp["best"]
+    if best is None or _is_better(entry["metric"], best["metric"], exp["greater_is_better"]):
+        exp["best"] = entry
+    return exp
+
+
+def record_model(entry: Dict[str, Any], experiment: str = DEFAULT_EXPERIMENT, metric: str = DEFAULT_METRIC,
+                 greater_is_better: bool = True, path=INDEX_PATH) -> Dict[str, Any]:
+    """Add a freshly logged model as ``latest`` (and ``best`` if its metric wins)."""
+    index = load_index(path)
+    exp = _add_entry(index, experiment, entry, metric, greater_is_better, path)
+    save_index(index, path)
+    return exp
+
+
+def promote(run_or_model_id: str, experiment: str = DEFAULT_EXPERIMENT, path=INDEX_PATH) -> Dict[str, Any]:
+    """Pin an indexed run (by run id or ``m-...`` model id) so ``resolve`` returns it."""
+    index = load_index(path)
+    exp = index["experiments"].get(experiment)
+    if exp is None:
+        raise KeyError(f"Experiment {experiment!r} is not in {path}")
+    for entry in exp["runs"].values():
+        if run_or_model_id in (entry["run_id"], entry["model_id"]):
+            exp["pinned"] = entry
+            save_index(index, path)
+            return entry
+    raise KeyError(f"No indexed model for {run_or_model_id!r} in experiment {experiment!r}")
+
+
+def unpin(experiment: str = DEFAULT_EXPERIMENT, path=INDEX_PATH) -> None:
+    index = load_index(path)
+    if experiment in index["experiments"]:
+        index["experiments"][experiment]["pinned"] = None
+        save_index(index, path)
+
+
+def is_compatible(entry: Dict[str, Any], feature_columns: Optional[List[str]],
+                  artifacts: Mapping[str, Optional[str]]) -> bool:
+    """Whether ``entry`` was trained with these feature columns and preprocessing artifact hashes.
+
+    Entries indexed without that record (older runs, ``rebuild``) cannot be
+    checked and never match.
+    """
+    recorded = entry.get("artifacts")
+    if recorded is None or entry.get("feature_columns") is None:
+        return False
+    if feature_columns is not None and list(feature_columns) != entry["feature_columns"]:
+        return False
+    return all(recorded.get(name) == artifacts.get(name) for name in PREPROCESSING_ARTIFACTS)
+
+
+def select(index: Dict[str, Any], experiment: str = DEFAULT_EXPERIMENT,
+           feature_columns: Optional[List[str]] = None,
+           artifacts: Optional[Mapping[str, Optional[str]]] = None) -> Optional[Dict[str, Any]]:
+    """The model to serve for ``experiment``: pinned, else best, else latest.
+
+    With ``artifacts`` (a ``preprocessing_fingerprint`` of models/) only
+    entries trained with those files are returned: a pin must match or
+    nothing is served, otherwise best falls back to latest.
+    """
+    exp = index["experiments"].get(experiment)
+    if exp is None:
+        return None
+    if artifacts is None:
+        return exp["pinned"] or exp["best"] or exp["latest"]
+    candidates = [exp["pinned"]] if exp["pinned"] else [exp["best"], exp["latest"]]
+    for entry in candidates:
+        if entry is not None and is_compatible(entry, feature_columns, artifacts):
+            return entry
+    return None
+
+
+def resolve(experiment: str = DEFAULT_EXPERIMENT, path=INDEX_PATH) -> Optional[Dict[str, Any]]:
+    """``select`` against the feature list and preprocessing artifacts next to the index."""
+    if not Path(path).exists():
+        return None
+    model_dir = Path(path).parent
+    features_path = model_dir / "feature_columns.json"
+    features = None
+    if features_path.exists():
+        with open(features_path, "r", encoding="utf-8") as f:
+            features = json.load(f)
+    return select(load_index(path), experiment, features, preprocessing_fingerprint(model_dir))
+
+
+def entry_local_path(entry: Dict[str, Any], path=INDEX_PATH) -> Optional[Path]:
+    if not entry.get("local_path"):
+        return None
+    local = Path(entry["local_path"])
+    return local if local.is_absolute() else _project_root(path) / local
+
+
+def _read_yaml(path: Path) -> Dict[str, Any]:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _last_metric(path: Path) -> Optional[float]:
+    if not path.exists():
+        return None
+    lines = [line.split() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return float(lines[-1][1]) if lines else None
+
+
+def rebuild(mlruns_dir=MLFLOW_RUNS_DIR, path=INDEX_PATH, metric: str = DEFAULT_METRIC,
+            greater_is_better: bool = True) -> Dict[str, Any]:
+    """One-off import of models already logged under a file-store ``mlruns`` directory.
+
+    Reads ``<exp>/models/m-*/meta.yaml`` (MLflow 3 layout) and keeps any pin
+    that still points at an indexed run. Model directories without a pickled
+    model are skipped. Imported entries carry no preprocessing record, so
+    ``select`` with ``artifacts`` will not serve them; they are kept for reporting.
+    """
+    mlruns_dir = Path(mlruns_dir)
+    old = load_index(path)
+    index = _empty_index()
+    for exp_meta in sorted(mlruns_dir.glob("*/meta.yaml")):
+        exp_dir = exp_meta.parent
+        experiment = _read_yaml(exp_meta).get("name")
+        logged = []
+        for model_meta in exp_dir.glob("models/m-*/meta.yaml"):
+            meta = _read_yaml(model_meta)
+            if meta.get("name") == MODEL_NAME:
+                logged.append((meta.get("creation_timestamp") or 0, model_meta.parent, meta))
+        for created, model_dir, meta in sorted(logged, key=lambda t: t[0]):
+            backend_param = exp_dir / str(meta.get("source_run_id")) / "params" / "backend"
+            entry = make_entry(
+                run_id=meta.get("source_run_id"),
+                model_uri=f"models:/{meta['model_id']}",
+                local_path=model_dir / "artifacts",
+                metric_value=_last_metric(model_dir / "metrics" / metric),
+                model_id=meta["model_id"],
+                backend=backend_param.read_text(encoding="utf-8").strip() if backend_param.exists() else None,
+                index_path=path,
+                logged_at=datetime.fromtimestamp(created / 1000, timezone.utc).isoformat(),
+            )
+            _add_entry(index, experiment, entry, metric, greater_is_better, path)
+
+    for experiment, exp in index["experiments"].items():
+        pinned = (old["experiments"].get(experiment) or {}).get("pinned")
+        if pinned and pinned["run_id"] in exp["runs"]:
+            exp["pinned"] = exp["runs"][pinned["run_id"]]
+    save_index(index, path)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and manage models/model_index.json.")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH)
+    parser.add_argument("--experiment", default=DEFAULT_EXPERIMENT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Print the model that predict.py would load")
+    promote_parser = sub.add_parser("promote", help="Pin a run id or model id")
+    promote_parser.add_argument("run_id")
+    sub.add_parser("unpin", help="Drop the pin and fall back to the best model")
+    rebuild_parser = sub.add_parser("rebuild", help="Index models already logged under mlruns/")
+    rebuild_parser.add_argument("--mlruns", type=Path, default=MLFLOW_RUNS_DIR)
+    args = parser.parse_args()
+
+    if args.command == "promote":
+        promote(args.run_id, args.experiment, args.index)
+    elif args.command == "unpin":
+        unpin(args.experiment, args.index)
+    elif args.command == "rebuild":
+        rebuild(args.mlruns, args.index)
+    print(json.dumps(resolve(args.experiment, args.index), indent=2))
@@ -0,0 +1,216 @@
+# src/peer_index.py
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import PEER_MIN_COUNT
+
+FORMAT_VERSION = 1
+# Peer groups from coarse to fine; a listing is compared with the finest group holding enough rows
+LEVELS = (
+    ("State",),
+    ("State", "City"),
+    ("State", "City", "Locality"),
+    ("State", "City", "Locality", "Property_Type", "BHK"),
+)
+LEVEL_NAMES = ("state", "city", "locality", "segment")
+KEY_COLUMNS = LEVELS[-1]
+QUANTILES = (0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+PEER_FEATURES = ("Locality_Relative_Price", "Peer_Price_Percentile")
+_LOCALITY = LEVEL_NAMES.index("locality")
+_MEDIAN = QUANTILES.index(0.5)
+
+
+def _group_quantiles(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted unique ``keys`` with their row counts and ``QUANTILES`` of ``values`` (linear interpolation)."""
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    uniq, start, counts = np.unique(keys, return_index=True, return_counts=True)
+    pos = start[:, None] + np.asarray(QUANTILES)[None, :] * (counts - 1)[:, None]
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    quantiles = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+    return uniq, counts.astype(np.int32), quantiles.astype(np.float32)
+
+
+class PeerIndex:
+    """Price_per_SqFt quantiles and counts per State -> City -> Locality -> Property_Type/BHK group.
+
+    Groups are keyed by the integer codes of ``models/encoding_tables.json``
+    (BHK as is), packed into one int64 per level, so the index is built
+    straight from the encoded training matrix and queried without touching
+    the CSV. ``lookup`` answers a single listing with at most one dict probe
+    per level; ``resolve``/``features`` do the same for a whole frame with
+    ``searchsorted`` over the sorted keys. Groups with fewer than
+    ``min_count`` rows fall back to the next coarser level, then to the
+    global distribution; unknown codes (-1) miss from their level down.
+    """
+
+    def __init__(self, radix: Dict[str, int], keys: List[np.ndarray], counts: List[np.ndarray],
+                 quantiles: List[np.ndarray], global_count: int, global_quantiles: np.ndarray,
+                 min_count: int = PEER_MIN_COUNT, metadata: Optional[Dict[str, Any]] = None):
+        self.radix = {c: int(radix[c]) for c in KEY_COLUMNS}
+        self.keys = [np.asarray(k, dtype=np.int64) for k in keys]
+        self.counts = [np.asarray(c, dtype=np.int32) for c in counts]
+        self.quantiles = [np.asarray(q, dtype=np.float32) for q in quantiles]
+        self.global_count = int(global_count)
+        self.global_quantiles = np.asarray(global_quantiles, dtype=np.float32)
+        self.min_count = int(min_count)
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self._rows: List[Optional[Dict[int, int]]] = [None] * len(LEVELS)
+
+    @classmethod
+    def from_matrix(cls, X: pd.DataFrame, min_count: int = PEER_MIN_COUNT) -> "PeerIndex":
+        """Build from encoded rows holding the ``KEY_COLUMNS`` codes and Price_per_SqFt."""
+        missing = [c for c in KEY_COLUMNS + ("Price_per_SqFt",) if c not in X.columns]
+        if missing:
+            raise ValueError(f"Required columns missing: {', '.join(missing)}")
+        radix = {}
+        for col in KEY_COLUMNS:
+            values = X[col].to_numpy(np.float64)
+            radix[col] = int(np.nanmax(values)) + 1 if np.isfinite(values).any() else 1
+        if np.prod([float(r) for r in radix.values()]) >= 2 ** 62:
+            raise ValueError("Peer group vocabularies are too large to pack into int64 keys")
+
+        index = cls(radix, [], [], [], 0, np.full(len(QUANTILES), np.nan), min_count,
+                    metadata={"n_rows": int(len(X))})
+        pps = X["Price_per_SqFt"].to_numpy(np.float64)
+        codes, valid = index._codes(X)
+        valid &= np.isfinite(pps)
+        for depth in range(len(LEVELS)):
+            keys, ok = index._pack(codes, valid, depth)
+            uniq, counts, quantiles = _group_quantiles(keys[ok], pps[ok])
+            index.keys.append(uniq)
+            index.counts.append(counts)
+            index.quantiles.append(quantiles)
+        finite = np.sort(pps[np.isfinite(pps)])
+        index.global_count = len(finite)
+        if len(finite):
+            index.global_quantiles = np.quantile(finite, QUANTILES).astype(np.float32)
+        return index
+
+    def _codes(self, X) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        n = len(X)
+        valid = np.ones(n, dtype=bool)
+        codes = {}
+        for col in KEY_COLUMNS:
+            if col not in X.columns:
+                codes[col] = np.zeros(n, dtype=np.int64)
+                continue
+            values = pd.to_numeric(X[col], errors="coerce").to_numpy(np.float64, na_value=np.nan)
+            codes[col] = np.where(np.isfinite(values), values, -1).astype(np.int64)
+        return codes, valid
+
+    def _pack(self, codes: Dict[str, np.ndarray], valid: np.ndarray, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+        keys = np.zeros(len(valid), dtype=np.int64)
+        ok = valid.copy()
+        for col in LEVELS[depth]:
+            code = codes[col]
+            ok &= (code >= 0) & (code < self.radix[col])
+            keys = keys * self.radix[col] + np.where(ok, code, 0)
+        return keys, ok
+
+    def _level_rows(self, depth: int) -> Dict[int, int]:
+        rows = self._rows[depth]
+        if rows is None:
+            rows = self._rows[depth] = {int(k): i for i, k in enumerate(self.keys[depth])}
+        return rows
+
+    def lookup(self, record: Mapping[str, Any], max_level: Optional[str] = None) -> Dict[str, Any]:
+        """Peer group of one encoded listing: ``level``, row ``count`` and Price_per_SqFt ``quantiles``."""
+        deepest = LEVEL_NAMES.index(max_level) if max_level else len(LEVELS) - 1
+        for depth in range(deepest, -1, -1):
+            key = 0
+            for col in LEVELS[depth]:
+                try:
+                    code = int(record.get(col))
+                except (TypeError, ValueError):
+                    code = -1
+                if not 0 <= code < self.radix[col]:
+                    break
+                key = key * self.radix[col] + code
+            else:
+                row = self._level_rows(depth).get(key)
+                if row is not None and self.counts[depth][row] >= self.min_count:
+                    return self._describe(LEVEL_NAMES[depth], int(self.counts[depth][row]), self.quantiles[depth][row])
+        return self._describe("global", self.global_count, self.global_quantiles)
+
+    @staticmethod
+    def _describe(level: str, count: int, quantiles: np.ndarray) -> Dict[str, Any]:
+        return {"level": level, "count": count, "quantiles": {str(q): float(v) for q, v in zip(QUANTILES, quantiles)}}
+
+    def resolve(self, X, max_level: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row ``(quantiles, level)`` for encoded rows; level -1 is the global distribution."""
+        deepest = LEVEL_NAMES.index(max_level) if max_level else len(LEVELS) - 1
+        codes, valid = self._codes(X)
+        quantiles = np.broadcast_to(self.global_quantiles, (len(valid), len(QUANTILES))).copy()
+        level = np.full(len(valid), -1, dtype=np.int8)
+        for depth in range(deepest + 1):
+            if not len(self.keys[depth]):
+                continue
+            keys, ok = self._pack(codes, valid, depth)
+            rows = np.minimum(np.searchsorted(self.keys[depth], keys), len(self.keys[depth]) - 1)
+            hit = ok & (self.keys[depth][rows] == keys) & (self.counts[depth][rows] >= self.min_count)
+            quantiles[hit] = self.quantiles[depth][rows[hit]]
+            level[hit] = depth
+        return quantiles, level
+
+    def features(self, X) -> pd.DataFrame:
+        """``PEER_FEATURES`` for encoded rows: price over the locality median and percentile among peers."""
+        pps = pd.to_numeric(X["Price_per_SqFt"], errors="coerce").to_numpy(np.float64, na_value=np.nan)
+        locality, _ = self.resolve(X, max_level="locality")
+        median = locality[:, _MEDIAN].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = np.where(median > 0, pps / median, np.nan)
+        peers, _ = self.resolve(X)
+        return pd.DataFrame({
+            "Locality_Relative_Price": relative.astype(np.float32),
+            "Peer_Price_Percentile": _percentile(peers, pps).astype(np.float32),
+        }, index=getattr(X, "index", None))
+
+    def save(self, path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for depth, name in enumerate(LEVEL_NAMES):
+            arrays[f"{name}_keys"] = self.keys[depth]
+            arrays[f"{name}_counts"] = self.counts[depth]
+            arrays[f"{name}_quantiles"] = self.quantiles[depth]
+        header = {"format_version": FORMAT_VERSION, "radix": self.radix, "quantiles": list(QUANTILES),
+                  "min_count": self.min_count, "global_count": self.global_count, "metadata": self.metadata}
+        np.savez(path, header=np.asarray(json.dumps(header)), global_quantiles=self.global_quantiles, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path, min_count: Optional[int] = None) -> "PeerIndex":
+        with np.load(path, allow_pickle=False) as f:
+            header = json.loads(str(f["header"]))
+            if header.get("format_version") != FORMAT_VERSION or tuple(header["quantiles"]) != QUANTILES:
+                raise ValueError(f"Unsupported peer index version {header.get('format_version')!r} in {path}")
+            return cls(
+                header["radix"],
+                [f[f"{name}_keys"] for name in LEVEL_NAMES],
+                [f[f"{name}_counts"] for name in LEVEL_NAMES],
+                [f[f"{name}_quantiles"] for name in LEVEL_NAMES],
+                header["global_count"],
+                f["global_quantiles"],
+                min_count=header["min_count"] if min_count is None else min_count,
+                metadata=header.get("metadata"),
+            )
+
+
+def _percentile(quantiles: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Interpolate each value's rank within its own row of ``QUANTILES`` cut points."""
+    grid = np.asarray(QUANTILES)
+    seg = np.clip((values[:, None] >= quantiles).sum(axis=1) - 1, 0, len(grid) - 2)
+    rows = np.arange(len(values))
+    lo, hi = quantiles[rows, seg].astype(np.float64), quantiles[rows, seg + 1].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip(np.where(hi > lo, (values - lo) / (hi - lo), 1.0), 0.0, 1.0)
+    out = grid[seg] + t * (grid[seg + 1] - grid[seg])
+    return np.where(np.isfinite(values), out, np.nan)
@@ -1,147 +1,279 @@
 import joblib
 import json
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 import warnings
 
 import numpy as np
 import pandas as pd
-import mlflow.sklearn
-from sklearn.preprocessing import LabelEncoder
 
-PROJECT_ROOT = Path(__file__).parent.parent
-MODEL_DIR = PROJECT_ROOT / "models"
+from src import model_index
+from src.artifacts import REGISTRY, file_sha256
+from src.city_medians import CityMedianTable
+from src.compact_model import CompactForest
+from src.config import CITY_MEDIAN_FALLBACK, MODEL_DIR, NUMERIC_DTYPES, USE_COMPACT_MODEL
+from src.encoding import UNKNOWN_CODE, EncodingTable
+from src.feature_engineering import price_per_sqft
+from src.peer_index import PEER_FEATURES, PeerIndex
+from src.tracing import TRACER, incr, span
+
 JOBLIB_MODEL_PATH = MODEL_DIR / "rf_investment_model.joblib"  
 ENCODERS_PATH = MODEL_DIR / "label_encoders.joblib"          
+ENCODING_TABLE_PATH = MODEL_DIR / "encoding_tables.json"
 FEATURES_PATH = MODEL_DIR / "feature_columns.json"           
+CITY_MEDIANS_PATH = MODEL_DIR / "city_medians.json"
+COMPACT_MODEL_PATH = MODEL_DIR / "compact_model.npz"
+PEER_INDEX_PATH = MODEL_DIR / "peer_index.npz"
+
+MODEL_INDEX_PATH = MODEL_DIR / "model_index.json"
+BATCH_CHUNK_SIZE = 50_000
+def _load_joblib(path: Path) -> Any:
+    return joblib.load(path)
+
+def _load_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _load_compact_model() -> Optional[CompactForest]:
+    """The array export of the joblib model, if present and built from the current joblib."""
+    if not (USE_COMPACT_MODEL and COMPACT_MODEL_PATH.exists() and JOBLIB_MODEL_PATH.exists()):
+        return None
+    try:
+        compact = REGISTRY.get("compact_model", COMPACT_MODEL_PATH, CompactForest.load)
+        source_sha = REGISTRY.get("model_sha256", JOBLIB_MODEL_PATH, file_sha256)
+    except Exception:
+        warnings.warn("Failed to load models/compact_model.npz; falling back to the joblib model.")
+        return None
+    if compact.source_sha256 != source_sha:
+        warnings.warn("models/compact_model.npz is stale for the current joblib model; ignoring it.")
+        return None
+    return compact
+
+def _load_model(prefer_compact: bool = True) -> Any:
+    with span("predict.load_model"):
+        return _resolve_model(prefer_compact)
+
+def _resolve_model(prefer_compact: bool) -> Any:
+    compact = _load_compact_model() if prefer_compact else None
+    if compact is not None:
+        return compact
 
-MLFLOW_RUNS_DIR = PROJECT_ROOT / "mlruns"
-TRAIN_DATA_PATH = PROJECT_ROOT / "data" / "india_housing_prices.csv" 
-def _load_model() -> Any:
-   
     if JOBLIB_MODEL_PATH.exists():
-        model = joblib.load(JOBLIB_MODEL_PATH)
-        return model
+        return REGISTRY.get("model", JOBLIB_MODEL_PATH, _load_joblib)
 
-    if MLFLOW_RUNS_DIR.exists():
-        try:
-            for experiment_dir in sorted(MLFLOW_RUNS_DIR.iterdir(), reverse=True):
-                if not experiment_dir.is_dir():
-                    continue
-                for run_dir in sorted(experiment_dir.iterdir(), reverse=True):
-                    candidate = run_dir / "artifacts" / "rf_investment_model"
-                    if candidate.exists():
-                        model_uri = f"runs:/{run_dir.name}/rf_investment_model"
-                        try:
-                            model = mlflow.sklearn.load_model(model_uri)
-                            return model
-                        except Exception:
-                            try:
-                                model = joblib.load(candidate)
-                                return model
-                            except Exception:
-                                continue
-        except Exception:
-            pass
+    entry = None
+    if MODEL_INDEX_PATH.exists():
+        index = REGISTRY.get("model_index", MODEL_INDEX_PATH, model_index.load_index)
+        _, feature_columns = _load_encoders_and_features()
+        entry = model_index.select(index, feature_columns=feature_columns, artifacts=_preprocessing_fingerprint())
+        if entry is None and model_index.select(index) is not None:
+            raise FileNotFoundError("No model in models/model_index.json was trained with the current "
+                                    "feature_columns.json and preprocessing artifacts "
+                                    f"({', '.join(model_index.PREPROCESSING_ARTIFACTS)}); retrain, or restore "
+                                    "models/rf_investment_model.joblib.")
+    if entry is not None:
+        local = model_index.entry_local_path(entry, MODEL_INDEX_PATH)
+        if local is not None and (local / "MLmodel").exists():
+            return REGISTRY.get("mlflow_model", local / "MLmodel", lambda p: _load_indexed_model(p.parent, entry))
+        name = f"mlflow_model:{entry['model_uri']}"
+        cached = REGISTRY.peek(name)
+        if cached is not None:
+            return cached
+        import mlflow.sklearn
+
+        return REGISTRY.put(name, mlflow.sklearn.load_model(entry["model_uri"]))
 
     raise FileNotFoundError("No model found. Place a joblib model at models/rf_investment_model.joblib "
-                            "or ensure MLflow artifacts exist under mlruns/.")
+                            "or train (or run `python -m src.model_index rebuild`) to index an MLflow model "
+                            "in models/model_index.json.")
+
+def _preprocessing_fingerprint() -> Dict[str, Optional[str]]:
+    # Same shape as model_index.preprocessing_fingerprint, with hashes cached until a file changes
+    return {name: REGISTRY.get(f"{name}_sha256", MODEL_DIR / name, file_sha256) if (MODEL_DIR / name).exists() else None
+            for name in model_index.PREPROCESSING_ARTIFACTS}
+
+def _load_indexed_model(model_dir: Path, entry: Dict[str, Any]) -> Any:
+    if entry.get("sha256") and model_index.artifact_sha256(model_dir) != entry["sha256"]:
+        warnings.warn(f"MLflow model at {model_dir} no longer matches the hash in models/model_index.json")
+    import mlflow.sklearn
+
+    return mlflow.sklearn.load_model(str(model_dir))
+
+def _load_encoding_table_from_label_encoders(path: Path) -> EncodingTable:
+    return EncodingTable.from_label_encoders(joblib.load(path))
 
-def _load_encoders_and_features() -> Tuple[dict, list]:
-  
-    encoders = {}
+def _load_encoders_and_features() -> Tuple[Optional[EncodingTable], list]:
+    with span("predict.load_encoders"):
+        return _resolve_encoders_and_features()
+
+def _resolve_encoders_and_features() -> Tuple[Optional[EncodingTable], list]:
+    encoders = None
     features = None
 
-    if ENCODERS_PATH.exists():
+    if ENCODING_TABLE_PATH.exists():
+        try:
+            encoders = REGISTRY.get("encoders", ENCODING_TABLE_PATH, EncodingTable.load)
+        except Exception:
+            warnings.warn("Failed to load encoding table from models/encoding_tables.json")
+    if encoders is None and ENCODERS_PATH.exists():
         try:
-            encoders = joblib.load(ENCODERS_PATH)
+            encoders = REGISTRY.get("encoders", ENCODERS_PATH, _load_encoding_table_from_label_encoders)
         except Exception:
             warnings.warn("Failed to load encoders from models/; proceeding without them.")
 
     if FEATURES_PATH.exists():
         try:
-            with open(FEATURES_PATH, "r", encoding="utf-8") as f:
-                features = json.load(f)
+            features = REGISTRY.get("feature_columns", FEATURES_PATH, _load_json)
         except Exception:
             warnings.warn("Failed to load feature column list from models/feature_columns.json")
 
     return encoders, features
 
-def _safe_build_dataframe(input_dict: Dict[str, Any], feature_columns: list = None, encoders: dict = None) -> pd.DataFrame:
-    df = pd.DataFrame([input_dict])
-    if ("Price_per_SqFt" not in df.columns or pd.isna(df.loc[0, "Price_per_SqFt"])) and \
-       ("Price_in_Lakhs" in df.columns and "Size_in_SqFt" in df.columns):
-        try:
-            if df.loc[0, "Size_in_SqFt"] and df.loc[0, "Size_in_SqFt"] > 0:
-                df["Price_per_SqFt"] = (df["Price_in_Lakhs"] * 100000) / df["Size_in_SqFt"]
-            else:
-                df["Price_per_SqFt"] = 0.0
-        except Exception:
-            df["Price_per_SqFt"] = 0.0
-    if ("Age_of_Property" not in df.columns or pd.isna(df.loc[0, "Age_of_Property"])) and ("Year_Built" in df.columns):
-        try:
-            df["Age_of_Property"] = 2025 - df["Year_Built"]
-        except Exception:
-            df["Age_of_Property"] = 0
+def _load_city_median_table(path: Path) -> CityMedianTable:
+    return CityMedianTable.load(path, fallback=CITY_MEDIAN_FALLBACK)
+
+def _load_city_medians() -> Optional[CityMedianTable]:
+    if not CITY_MEDIANS_PATH.exists():
+        return None
+    try:
+        return REGISTRY.get("city_medians", CITY_MEDIANS_PATH, _load_city_median_table)
+    except Exception:
+        warnings.warn("Failed to load City_Median table from models/city_medians.json")
+        return None
+
+def _load_peer_index() -> Optional[PeerIndex]:
+    if not PEER_INDEX_PATH.exists():
+        return None
+    try:
+        return REGISTRY.get("peer_index", PEER_INDEX_PATH, PeerIndex.load)
+    except Exception:
+        warnings.warn("Failed to load peer index from models/peer_index.npz")
+        return None
+
+def warm_up() -> Dict[str, Dict[str, Any]]:
+    _load_model()
+    _load_encoders_and_features()
+    _load_city_medians()
+    _load_peer_index()
+    return REGISTRY.stats()
+
+def artifact_versions() -> Tuple[Optional[str], ...]:
+    """Content hashes of the loaded scoring artifacts, reloading any that changed on disk.
+
+    Use it to key caches of predictions so they are dropped when a new model
+    or table is deployed.
+    """
+    warm_up()
+    return tuple(REGISTRY.version(name) for name in
+                 ("compact_model", "model", "mlflow_model", "encoders", "feature_columns", "city_medians",
+                  "peer_index"))
+
+def get_load_timings() -> Dict[str, Dict[str, Any]]:
+    return REGISTRY.stats()
+
+def _build_features(df: pd.DataFrame, feature_columns: list = None, encoders: Optional[EncodingTable] = None) -> pd.DataFrame:
+    with span("predict.build_features"):
+        return _derive_and_encode(df, feature_columns, encoders)
+
+def _derive_and_encode(df: pd.DataFrame, feature_columns: list = None, encoders: Optional[EncodingTable] = None) -> pd.DataFrame:
+    df = df.copy()
+    if "Price_in_Lakhs" in df.columns and "Size_in_SqFt" in df.columns:
+        current = df["Price_per_SqFt"] if "Price_per_SqFt" in df.columns else pd.Series(np.nan, index=df.index)
+        missing = current.isna()
+        if missing.any():
+            price = pd.to_numeric(df["Price_in_Lakhs"], errors="coerce").to_numpy(np.float64, na_value=np.nan)
+            size = pd.to_numeric(df["Size_in_SqFt"], errors="coerce").to_numpy(np.float64, na_value=np.nan)
+            df["Price_per_SqFt"] = current.where(~missing, price_per_sqft(price, size))
+    if "Year_Built" in df.columns:
+        current = df["Age_of_Property"] if "Age_of_Property" in df.columns else pd.Series(np.nan, index=df.index)
+        missing = current.isna()
+        if missing.any():
+            derived = 2025 - pd.to_numeric(df["Year_Built"], errors="coerce")
+            df["Age_of_Property"] = current.where(~missing, derived)
     if "City_Median" not in df.columns:
-        try:
-            df_train = pd.read_csv(TRAIN_DATA_PATH)
-            city_median_map = df_train.groupby("City")["Price_per_SqFt"].median().to_dict()
-            df["City_Median"] = df["City"].map(city_median_map)
-        except Exception:
+        city_medians = _load_city_medians()
+        if city_medians is not None and "City" in df.columns:
+            states = df["State"] if "State" in df.columns else None
+            df["City_Median"] = city_medians.map(df["City"], states)
+        else:
             df["City_Median"] = 0.0
     if feature_columns:
-        for col in feature_columns:
-            if col not in df.columns:
-                df[col] = 0  
-        df = df[feature_columns]
-    if encoders:
-        for col, le in encoders.items():
-            if col in df.columns:
-                try:
-                    vals = df[col].astype(str).fillna("missing")
-                    try:
-                        df[col] = le.transform(vals)
-                    except Exception:
-                        existing = list(le.classes_)
-                        new_vals = [v for v in vals.unique() if v not in existing]
-                        if new_vals:
-                            le_classes = list(le.classes_) + new_vals
-                            new_le = LabelEncoder()
-                            new_le.classes_ = np.array(le_classes, dtype=object)
-                            df[col] = new_le.transform(vals)
-                        else:
-                            df[col] = le.transform(vals)
-                except Exception:
-                    df[col] = 0
-    else:
-        for col in df.select_dtypes(include=["object", "category"]).columns:
-            le = LabelEncoder()
-            vals = df[col].astype(str).fillna("missing")
-            try:
-                le.fit(vals)
-                df[col] = le.transform(vals)
-            except Exception:
-                df[col] = 0
+        df = df.reindex(columns=feature_columns, fill_value=0)
+    if encoders is not None:
+        with span("predict.encode"):
+            df = encoders.transform(df)
+    peer_columns = [c for c in PEER_FEATURES if c in df.columns]
+    if peer_columns and encoders is not None:
+        peer_index = _load_peer_index()
+        if peer_index is None:
+            warnings.warn(f"Model expects {peer_columns} but models/peer_index.npz is unavailable; scoring them as 0.")
+        else:
+            with span("predict.peer_features"):
+                df[peer_columns] = peer_index.features(df)[peer_columns]
+    # A non-numeric value in a numeric column must only void that cell, not the column for every row
+    for col in df.select_dtypes(include=["object"]).columns:
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().any() or df[col].isna().all():
+            df[col] = numeric
+    unencoded = df.select_dtypes(include=["object", "category"]).columns
+    if len(unencoded):
+        warnings.warn(f"No encoding vocabulary for {list(unencoded)}; scoring them as unknown categories.")
+        df[unencoded] = UNKNOWN_CODE
 
     df = df.fillna(0)
     return df
 
+def validate_record(record: Dict[str, Any]) -> None:
+    """Raise ValueError if a numeric field of one listing holds a value that is not a number."""
+    if not isinstance(record, dict):
+        raise ValueError("A listing must be a JSON object")
+    bad = []
+    for col in NUMERIC_DTYPES:
+        value = record.get(col)
+        if value is None or value == "" or isinstance(value, bool):
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            bad.append(f"{col}={value!r}")
+    if bad:
+        raise ValueError(f"Non-numeric values for numeric fields: {', '.join(bad)}")
+
+def _safe_build_dataframe(input_dict: Dict[str, Any], feature_columns: list = None, encoders: Optional[EncodingTable] = None) -> pd.DataFrame:
+    with span("predict.frame"):
+        df = pd.DataFrame([input_dict])
+    return _build_features(df, feature_columns, encoders)
+
+def peer_comparison(input_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """How a listing's Price_per_SqFt compares to its finest well-populated peer group, or None without an index."""
+    peer_index = _load_peer_index()
+    encoders, _ = _load_encoders_and_features()
+    if peer_index is None or encoders is None:
+        return None
+    df = _derive_and_encode(pd.DataFrame([input_dict]), None, encoders)
+    record = df.iloc[0].to_dict()
+    peers = peer_index.lookup(record)
+    features = peer_index.features(df).iloc[0]
+    peers.update({name: float(features[name]) for name in PEER_FEATURES})
+    return peers
+
 def predict_from_dict(input_dict: Dict[str, Any]) -> Dict[str, Any]:
+    incr("predict.single_calls")
     model = _load_model()
     encoders, feature_columns = _load_encoders_and_features()
     df = _safe_build_dataframe(input_dict, feature_columns, encoders)
 
     try:
-        X = df
-        pred = model.predict(X)
-        proba = None
+        # One model call: the label is the argmax of predict_proba, as in predict_records
         if hasattr(model, "predict_proba"):
-            try:
-                probs = model.predict_proba(X)
-                proba = probs.tolist()
-            except Exception:
-                proba = None
+            with span("predict.predict_proba"):
+                probs = model.predict_proba(df)
+            pred = np.asarray(model.classes_)[probs.argmax(axis=1)]
+            proba = probs.tolist()
+        else:
+            with span("predict.predict"):
+                pred = model.predict(df)
+            proba = None
         return {
             "prediction": int(pred[0]) if isinstance(pred, (list, np.ndarray)) else int(pred),
             "probability": proba,
@@ -149,32 +281,180 @@ def predict_from_dict(input_dict: Dict[str, Any]) -> Dict[str, Any]:
         }
     except Exception as e:
         raise RuntimeError(f"Prediction failed: {e}")
+def predict_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score several input dicts in one model call; results match ``predict_from_dict``."""
+    incr("predict.records_calls")
+    incr("predict.rows", len(records))
+    model = _load_model()
+    encoders, feature_columns = _load_encoders_and_features()
+    with span("predict.frame"):
+        df = pd.DataFrame(records)
+    df = _build_features(df, feature_columns, encoders)
+
+    try:
+        if hasattr(model, "predict_proba"):
+            with span("predict.predict_proba"):
+                probs = model.predict_proba(df)
+            preds = np.asarray(model.classes_)[probs.argmax(axis=1)]
+        else:
+            probs = None
+            preds = model.predict(df)
+    except Exception as e:
+        raise RuntimeError(f"Prediction failed: {e}")
+
+    rows = df.to_dict(orient="records")
+    return [
+        {
+            "prediction": int(preds[i]),
+            "probability": [probs[i].tolist()] if probs is not None else None,
+            "input_features": rows[i],
+        }
+        for i in range(len(rows))
+    ]
+
+def _iter_file_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif suffix in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        raise ValueError(f"Unsupported input format for batch scoring: {path.suffix}")
+
+def _timed_chunks(chunks: Iterator[pd.DataFrame], name: str) -> Iterator[pd.DataFrame]:
+    chunks = iter(chunks)
+    while True:
+        with span(name):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+def _iter_frame_chunks(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def _score_chunk(model: Any, X: pd.DataFrame) -> pd.DataFrame:
+    out = pd.DataFrame(index=X.index)
+    if hasattr(model, "predict_proba"):
+        with span("predict.predict_proba"):
+            probs = model.predict_proba(X)
+        classes = np.asarray(model.classes_)
+        out["prediction"] = classes[probs.argmax(axis=1)]
+        for i, cls in enumerate(classes):
+            out[f"probability_{cls}"] = probs[:, i]
+    else:
+        out["prediction"] = model.predict(X)
+    return out
+
+def predict_batch(data: Union[pd.DataFrame, str, Path], chunk_size: int = BATCH_CHUNK_SIZE,
+                  keep_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Score many listings at once.
+
+    ``data`` is a DataFrame or a path to a CSV/Parquet file. Derived features and
+    encodings are applied column-wise and the model is called once per chunk of
+    ``chunk_size`` rows. The result is indexed like the input rows and holds the
+    predicted class plus one ``probability_<class>`` column per model class;
+    ``keep_columns`` present in the input (e.g. ``["ID"]``) are carried through.
+    Large chunks are scored by the sklearn model, which outruns the compact
+    export once per-call overhead no longer dominates.
+    """
+    model = _load_model(prefer_compact=False)
+    encoders, feature_columns = _load_encoders_and_features()
+
+    if isinstance(data, pd.DataFrame):
+        chunks = _iter_frame_chunks(data, chunk_size)
+    else:
+        chunks = _timed_chunks(_iter_file_chunks(Path(data), chunk_size), "predict.read_chunk")
+
+    incr("predict.batch_calls")
+    results = []
+    for chunk in chunks:
+        incr("predict.batch_chunks")
+        incr("predict.rows", len(chunk))
+        X = _build_features(chunk, feature_columns, encoders)
+        try:
+            scored = _score_chunk(model, X)
+        except Exception as e:
+            raise RuntimeError(f"Batch prediction failed: {e}")
+        if keep_columns:
+            carried = [c for c in keep_columns if c in chunk.columns]
+            scored = pd.concat([chunk[carried], scored], axis=1)
+        results.append(scored)
+
+    if not results:
+        return pd.DataFrame(columns=list(keep_columns or []) + ["prediction"])
+    return pd.concat(results)
+
+# Inputs that other features are derived from; sweeping them clears the derived value so it is recomputed
+_DERIVED_FROM = {"Price_in_Lakhs": "Price_per_SqFt", "Size_in_SqFt": "Price_per_SqFt", "Year_Built": "Age_of_Property"}
+
+def sensitivity_sweep(input_dict: Dict[str, Any], field: str, values, recompute_derived: bool = True) -> pd.DataFrame:
+    """Score ``input_dict`` with ``field`` set to each of ``values`` in a single batch call."""
+    values = np.asarray(values)
+    variants = pd.DataFrame([input_dict] * len(values))
+    variants[field] = values
+    derived = _DERIVED_FROM.get(field)
+    if recompute_derived and derived is not None:
+        variants[derived] = np.nan
+    scored = predict_batch(variants, chunk_size=max(len(variants), 1))
+    scored.insert(0, field, values)
+    return scored.reset_index(drop=True)
+
+def _write_frame(df: pd.DataFrame, path: Path) -> None:
+    if path.suffix.lower() in (".parquet", ".pq"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
 if __name__ == "__main__":
-    example = {
-        "ID": 1,
-        "State": "Tamil Nadu",
-        "City": "Chennai",
-        "Locality": "Locality_84",
-        "Property_Type": "Apartment",
-        "BHK": 1,
-        "Size_in_SqFt": 4740,
-        "Price_in_Lakhs": 489.76,
-        "Price_per_SqFt": 0,
-        "Year_Built": 1990,
-        "Furnished_Status": "Furnished",
-        "Floor_No": 22,
-        "Total_Floors": 1,
-        "Age_of_Property": 35,
-        "Nearby_Schools": 10,
-        "Nearby_Hospitals": 3,
-        "Public_Transport_Accessibility": "High",
-        "Parking_Space": "No",
-        "Security": "No",
-        "Amenities": "Playground, Gym, Garden, Pool, Clubhouse",
-        "Facing": "West",
-        "Owner_Type": "Owner",
-        "Availability_Status": "Ready_to_Move"
-    }
-    out = predict_from_dict(example)
-    import json
-    print(json.dumps(out, indent=2))
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score listings with the investment classifier.")
+    parser.add_argument("--input", type=Path, help="CSV or Parquet file of listings to score offline")
+    parser.add_argument("--output", type=Path, help="Where to write predictions (CSV or Parquet)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--trace", type=Path, help="Write per-stage timing histograms to this JSON file")
+    args = parser.parse_args()
+
+    if args.input is not None:
+        scored = predict_batch(args.input, chunk_size=args.chunk_size, keep_columns=["ID"])
+        output = args.output or args.input.with_name(args.input.stem + "_predictions.csv")
+        _write_frame(scored, output)
+        print(f"Scored {len(scored)} rows -> {output}")
+    else:
+        example = {
+            "ID": 1,
+            "State": "Tamil Nadu",
+            "City": "Chennai",
+            "Locality": "Locality_84",
+            "Property_Type": "Apartment",
+            "BHK": 1,
+            "Size_in_SqFt": 4740,
+            "Price_in_Lakhs": 489.76,
+            "Price_per_SqFt": 0,
+            "Year_Built": 1990,
+            "Furnished_Status": "Furnished",
+            "Floor_No": 22,
+            "Total_Floors": 1,
+            "Age_of_Property": 35,
+            "Nearby_Schools": 10,
+            "Nearby_Hospitals": 3,
+            "Public_Transport_Accessibility": "High",
+            "Parking_Space": "No",
+            "Security": "No",
+            "Amenities": "Playground, Gym, Garden, Pool, Clubhouse",
+            "Facing": "West",
+            "Owner_Type": "Owner",
+            "Availability_Status": "Ready_to_Move"
+        }
+        out = predict_from_dict(example)
+        print(json.dumps(out, indent=2))
+    if args.trace is not None:
+        print(f"Stage timings -> {TRACER.export_json(args.trace)}")
@@ -1,18 +1,92 @@
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
 from sklearn.experimental import enable_iterative_imputer  
-from sklearn.impute import IterativeImputer, SimpleImputer
+from sklearn.impute import IterativeImputer, KNNImputer, SimpleImputer
 from category_encoders import TargetEncoder
 
-from src.transformers import OutlierFlagger, PricePerSqftAdder, AgeCalculator
-from src.config import SEED
+from src.transformers import OutlierFlagger, PricePerSqftAdder, AgeCalculator, DerivedFeatures, SampledImputer
+from src.config import SEED, IMPUTATION_STRATEGY, IMPUTATION_SAMPLE_SIZE, PREPROCESSING_OUTPUT
 
-def build_preprocessing(df, target):
+IMPUTATION_STRATEGIES = ("iterative", "iterative_sampled", "knn", "median")
+OUTPUT_MODES = ("dense", "float32", "sparse")
+# Their estimators read entries a scipy.sparse matrix does not store as missing values rather than as 0.0
+IMPLICIT_MISSING_LIBRARIES = ("xgboost", "lightgbm")
+
+def _to_float32(X):
+    return X.astype(np.float32, copy=False)
+
+def matrix_nbytes(X):
+    if sp.issparse(X):
+        X = X.tocsr()
+        return int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+    return int(np.asarray(X).nbytes)
+
+def describe_matrix(X):
+    """Shape, format, dtype, size and density; ``implicit_zeros`` counts cells a sparse matrix does not store.
+
+    Those cells are 0.0 (an absent one-hot category or a numeric value that
+    scaled to exactly 0), not missing values.
+    """
+    return {
+        "shape": list(X.shape),
+        "format": X.format if sp.issparse(X) else "dense",
+        "dtype": str(X.dtype),
+        "nbytes": matrix_nbytes(X),
+        "density": float(X.nnz / max(1, X.shape[0] * X.shape[1])) if sp.issparse(X) else 1.0,
+        "implicit_zeros": int(X.shape[0] * X.shape[1] - X.nnz) if sp.issparse(X) else 0,
+    }
+
+def reads_implicit_zeros_as_missing(estimator) -> bool:
+    """Whether ``estimator`` (an instance, class or library name) treats unstored sparse entries as missing."""
+    if isinstance(estimator, str):
+        library = estimator
+    else:
+        library = (estimator if isinstance(estimator, type) else type(estimator)).__module__
+    return library.split(".")[0] in IMPLICIT_MISSING_LIBRARIES
+
+def check_output_for(estimator, output):
+    """Raise ValueError if ``output`` is "sparse" and ``estimator`` would read its implicit zeros as missing."""
+    if output == "sparse" and reads_implicit_zeros_as_missing(estimator):
+        name = estimator if isinstance(estimator, str) else getattr(estimator, "__name__", type(estimator).__name__)
+        raise ValueError(f"{name} treats the implicit zeros of sparse preprocessing output as missing values; "
+                         f"use output='float32' or 'dense' instead")
+
+def make_numeric_imputer(strategy=None, sample_size=None):
+    strategy = strategy or IMPUTATION_STRATEGY
+    sample_size = sample_size or IMPUTATION_SAMPLE_SIZE
+    if strategy == "iterative":
+        return IterativeImputer(random_state=SEED, max_iter=10)
+    if strategy == "iterative_sampled":
+        return SampledImputer(IterativeImputer(random_state=SEED, max_iter=10), sample_size, random_state=SEED)
+    if strategy == "knn":
+        return SampledImputer(KNNImputer(n_neighbors=5), sample_size, random_state=SEED)
+    if strategy == "median":
+        return SimpleImputer(strategy="median")
+    raise ValueError(f"Unknown imputation strategy {strategy!r}; expected one of {IMPUTATION_STRATEGIES}")
+
+def build_preprocessing(df, target, fused=True, imputation=None, imputation_sample_size=None, output=None,
+                        estimator=None):
+    """Derived-feature + impute/scale/one-hot pipeline for ``df``.
+
+    ``output`` is "dense" (float64), "float32" or "sparse" (float32 CSR). In
+    sparse mode every block, the scaled numeric one included, is stored as
+    CSR, so an unstored cell means 0.0: an absent one-hot category, or a
+    numeric value equal to its column's training mean.
+    XGBoost and LightGBM read unstored cells as missing instead; pass the
+    downstream ``estimator`` to have that combination rejected.
+    """
+    output = output or PREPROCESSING_OUTPUT
+    if output not in OUTPUT_MODES:
+        raise ValueError(f"Unknown preprocessing output {output!r}; expected one of {OUTPUT_MODES}")
+    if estimator is not None:
+        check_output_for(estimator, output)
+    compact = output != "dense"
     df = df.copy()
-    numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    numeric_cols = df.select_dtypes(include="number").columns.tolist()
     cat_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
 
     to_exclude = {"ID", target, "Good_Investment", "Future_Price_5yrs"}
@@ -27,14 +101,16 @@ def build_preprocessing(df, target):
         target_encoder = TargetEncoder(cols=high_card)
         df[high_card] = target_encoder.fit_transform(df[high_card], df[target])
 
-    numeric_pipeline = Pipeline([
-        ("imputer", IterativeImputer(random_state=SEED, max_iter=10)),
-        ("scaler", StandardScaler())
-    ])
+    numeric_steps = [("imputer", make_numeric_imputer(imputation, imputation_sample_size))]
+    if compact:
+        # StandardScaler keeps float32 input as float32
+        numeric_steps.append(("float32", FunctionTransformer(_to_float32, feature_names_out="one-to-one")))
+    numeric_pipeline = Pipeline(numeric_steps + [("scaler", StandardScaler())])
 
     low_card_pipeline = Pipeline([
         ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
-        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+        ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=output == "sparse",
+                                 dtype=np.float32 if compact else np.float64))
     ])
 
     preprocessor = ColumnTransformer(
@@ -43,14 +119,20 @@ def build_preprocessing(df, target):
             ("low_cat", low_card_pipeline, low_card)
         ],
         remainder="drop",
+        # In sparse mode always stack into CSR, numeric block included; see the docstring on implicit zeros
+        sparse_threshold=1.0 if output == "sparse" else 0.3,
         verbose_feature_names_out=False,
     )
 
-    full_pipeline = Pipeline([
-        ("outlier_flag", OutlierFlagger(numeric_cols=numeric_cols)),
-        ("price_per_sqft", PricePerSqftAdder()),
-        ("age", AgeCalculator()),
-        ("preprocessor", preprocessor)
-    ])
+    if fused:
+        # The ColumnTransformer selects columns by name, so keep this step's output a DataFrame
+        derived_steps = [("derived", DerivedFeatures(numeric_cols=numeric_cols).set_output(transform="pandas"))]
+    else:
+        derived_steps = [
+            ("outlier_flag", OutlierFlagger(numeric_cols=numeric_cols)),
+            ("price_per_sqft", PricePerSqftAdder()),
+            ("age", AgeCalculator()),
+        ]
+    full_pipeline = Pipeline(derived_steps + [("preprocessor", preprocessor)])
 
     return full_pipeline, numeric_cols, high_card, low_card, target_encoder, df
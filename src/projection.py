@@ -0,0 +1,140 @@
+# src/projection.py
+import json
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.config import (CITY_GROWTH_RATES, CITY_GROWTH_RATES_PATH, DEFAULT_GROWTH_RATE, FUTURE_YEARS,
+                        PROJECTION_CHUNK_MB, PROJECTION_VOLATILITY, SEED)
+
+TARGET = f"Future_Price_{FUTURE_YEARS}yrs"
+
+
+def load_growth_rates(path=CITY_GROWTH_RATES_PATH) -> Dict[str, float]:
+    """City -> annual growth rate: ``CITY_GROWTH_RATES`` overlaid with the JSON file at ``path`` if present."""
+    rates = {str(k): float(v) for k, v in CITY_GROWTH_RATES.items()}
+    path = Path(path)
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            rates.update({str(k): float(v) for k, v in json.load(f).items()})
+    return rates
+
+
+def growth_rates(cities, rates: Optional[Mapping[str, float]] = None,
+                 default: float = DEFAULT_GROWTH_RATE) -> np.ndarray:
+    """Annual growth rate per row; cities missing from ``rates`` grow at ``default``."""
+    rates = load_growth_rates() if rates is None else rates
+    cities = pd.Series(cities)
+    if not rates:
+        return np.full(len(cities), default, dtype=np.float64)
+    return cities.astype(str).map(rates).astype("float64").fillna(default).to_numpy()
+
+
+def project_prices(prices, rates, years: float = FUTURE_YEARS) -> np.ndarray:
+    """Compound ``prices`` forward ``years`` at ``rates`` (a scalar or one rate per price)."""
+    prices = np.asarray(prices, dtype=np.float64)
+    return prices * np.power(1.0 + np.asarray(rates, dtype=np.float64), years)
+
+
+def project_frame(df: pd.DataFrame, rates: Optional[Mapping[str, float]] = None, years: float = FUTURE_YEARS,
+                  price_column: str = "Price_in_Lakhs") -> pd.Series:
+    """Projected price of every listing in ``df``, growing each at its city's rate."""
+    city_rates = growth_rates(df["City"], rates) if "City" in df.columns else DEFAULT_GROWTH_RATE
+    prices = pd.to_numeric(df[price_column], errors="coerce").to_numpy(np.float64, na_value=np.nan)
+    return pd.Series(project_prices(prices, city_rates, years), index=df.index, name=f"Future_Price_{years:g}yrs")
+
+
+def add_future_price(df: pd.DataFrame, rates: Optional[Mapping[str, float]] = None,
+                     years: float = FUTURE_YEARS) -> pd.DataFrame:
+    """Copy of ``df`` with the deterministic projection as the ``TARGET`` regression column."""
+    df = df.copy()
+    df[TARGET if years == FUTURE_YEARS else f"Future_Price_{years:g}yrs"] = project_frame(df, rates, years)
+    return df
+
+
+def simulate(prices, rates, years: int = FUTURE_YEARS, n_paths: int = 1000,
+             volatility: float = PROJECTION_VOLATILITY, quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+             seed: int = SEED, chunk_mb: float = PROJECTION_CHUNK_MB) -> Dict[str, np.ndarray]:
+    """Monte Carlo distribution of future prices under lognormal annual growth.
+
+    Each year's log return is normal with mean ``log(1 + rate) - volatility**2 / 2``
+    (so the expected price matches ``project_prices``) and sd ``volatility``;
+    the ``years``-year total is drawn directly as their sum. Properties are
+    processed in chunks whose ``n_paths x rows`` float32 block fits in
+    ``chunk_mb``, so memory stays flat however large the portfolio is. Returns
+    per-property ``mean``, ``std``, ``prob_loss`` and ``q<quantile>`` arrays,
+    plus ``portfolio`` (the summed value on every path). Draws come from one
+    generator seeded with ``seed``, so results are reproducible for a given
+    ``chunk_mb``.
+    """
+    prices = np.asarray(prices, dtype=np.float32)
+    n = len(prices)
+    rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), (n,))
+    drift = (years * (np.log1p(rates) - 0.5 * volatility ** 2)).astype(np.float32)
+    scale = np.float32(volatility * np.sqrt(years))
+    chunk_rows = max(1, int(chunk_mb * 2 ** 20 // (4 * max(n_paths, 1))))
+
+    out = {"mean": np.empty(n, np.float32), "std": np.empty(n, np.float32), "prob_loss": np.empty(n, np.float32)}
+    out.update({f"q{q:g}": np.empty(n, np.float32) for q in quantiles})
+    portfolio = np.zeros(n_paths, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    buffer = np.empty(n_paths * min(chunk_rows, max(n, 1)), dtype=np.float32)
+    for start in range(0, n, chunk_rows):
+        stop = min(start + chunk_rows, n)
+        block = buffer[:n_paths * (stop - start)].reshape(n_paths, stop - start)
+        rng.standard_normal(out=block, dtype=np.float32)
+        block *= scale
+        block += drift[start:stop]
+        np.exp(block, out=block)
+        block *= prices[start:stop]
+
+        out["mean"][start:stop] = block.mean(axis=0)
+        out["std"][start:stop] = block.std(axis=0)
+        out["prob_loss"][start:stop] = (block < prices[start:stop]).mean(axis=0)
+        for q, values in zip(quantiles, np.quantile(block, quantiles, axis=0)):
+            out[f"q{q:g}"][start:stop] = values
+        portfolio += block.sum(axis=1, dtype=np.float64)
+    out["portfolio"] = portfolio
+    return out
+
+
+def simulate_frame(df: pd.DataFrame, n_paths: int = 1000, rates: Optional[Mapping[str, float]] = None,
+                   years: int = FUTURE_YEARS, price_column: str = "Price_in_Lakhs", **kwargs):
+    """``simulate`` for the listings in ``df``: a per-listing summary frame and the portfolio path totals."""
+    city_rates = growth_rates(df["City"], rates) if "City" in df.columns else DEFAULT_GROWTH_RATE
+    prices = pd.to_numeric(df[price_column], errors="coerce").to_numpy(np.float32)
+    result = simulate(prices, city_rates, years, n_paths, **kwargs)
+    portfolio = result.pop("portfolio")
+    summary = pd.DataFrame(result, index=df.index)
+    summary.insert(0, "expected", project_prices(prices, city_rates, years).astype(np.float32))
+    return summary, portfolio
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from src.config import DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Project listing prices FUTURE_YEARS ahead.")
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--paths", type=int, default=1000, help="Monte Carlo paths per listing")
+    parser.add_argument("--years", type=int, default=FUTURE_YEARS)
+    parser.add_argument("--output", default=None, help="Write the per-listing summary to this CSV")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data, usecols=lambda c: c in ("ID", "City", "Price_in_Lakhs"))
+    start = time.perf_counter()
+    summary, portfolio = simulate_frame(df, args.paths, years=args.years)
+    elapsed = time.perf_counter() - start
+    lo, mid, hi = np.quantile(portfolio, [0.05, 0.5, 0.95])
+    print(f"Simulated {args.paths} paths x {len(df)} listings in {elapsed:.2f}s")
+    print(f"Portfolio value in {args.years} years: median {mid:,.0f} (90% interval {lo:,.0f} - {hi:,.0f}) "
+          f"vs {df['Price_in_Lakhs'].sum():,.0f} today")
+    if args.output:
+        if "ID" in df.columns:
+            summary.insert(0, "ID", df["ID"])
+        summary.to_csv(args.output, index=False)
+        print(f"Summary written to {args.output}")
@@ -0,0 +1,269 @@
+# src/serve.py
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import SERVE_HOST, SERVE_PORT, SERVE_MAX_BATCH_SIZE, SERVE_MAX_WAIT_MS
+from src.predict import predict_records, validate_record, warm_up
+from src.tracing import TRACER
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+
+class LatencyStats:
+    def __init__(self, window: int = 10_000):
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def record_batch(self, size: int) -> None:
+        self.batch_sizes.append(size)
+
+    def snapshot(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self.started
+        out = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "uptime_seconds": uptime,
+            "throughput_rps": self.requests / uptime if uptime > 0 else 0.0,
+            "latency_ms": None,
+            "batches": len(self.batch_sizes),
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+        }
+        if self.latencies:
+            lat = np.asarray(self.latencies) * 1000.0
+            out["latency_ms"] = {
+                "p50": float(np.percentile(lat, 50)),
+                "p99": float(np.percentile(lat, 99)),
+                "mean": float(lat.mean()),
+                "max": float(lat.max()),
+            }
+        return out
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests into one scoring call.
+
+    The first queued request opens a window of ``max_wait_ms``; everything that
+    arrives before it closes (up to ``max_batch_size``) is scored together in a
+    worker thread so the event loop keeps accepting connections.
+    """
+
+    def __init__(self, score_fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 max_batch_size: int = SERVE_MAX_BATCH_SIZE, max_wait_ms: float = SERVE_MAX_WAIT_MS,
+                 stats: Optional[LatencyStats] = None,
+                 validate_fn: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.score_fn = score_fn
+        self.validate_fn = validate_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = stats
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        # Invalid records are rejected here so they never share a batch with valid ones
+        if self.validate_fn is not None:
+            self.validate_fn(record)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            if self.stats is not None:
+                self.stats.record_batch(len(records))
+            try:
+                results = await loop.run_in_executor(None, self.score_fn, records)
+            except Exception as e:
+                if len(batch) == 1:
+                    if not batch[0][1].done():
+                        batch[0][1].set_exception(e)
+                    continue
+                # Rescore one record at a time so only the records that fail get an error
+                for record, future in batch:
+                    try:
+                        result = (await loop.run_in_executor(None, self.score_fn, [record]))[0]
+                    except Exception as record_error:
+                        if not future.done():
+                            future.set_exception(record_error)
+                        continue
+                    if not future.done():
+                        future.set_result(result)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class ScoringServer:
+    """Minimal HTTP/1.1 JSON server around the investment classifier.
+
+    Routes: ``POST /predict`` (one listing object or a list of them),
+    ``GET /health`` and ``GET /metrics`` (p50/p99 latency, throughput, batch sizes
+    and the per-stage timings from ``src.tracing``).
+    """
+
+    def __init__(self, host: str = SERVE_HOST, port: int = SERVE_PORT,
+                 max_batch_size: int = SERVE_MAX_BATCH_SIZE, max_wait_ms: float = SERVE_MAX_WAIT_MS,
+                 score_fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]] = predict_records,
+                 warm: bool = True):
+        self.host = host
+        self.port = port
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(score_fn, max_batch_size, max_wait_ms, self.stats, validate_record)
+        self.warm = warm
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        if self.warm:
+            await asyncio.get_running_loop().run_in_executor(None, warm_up)
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self) -> None:
+        server = await self.start()
+        print(f"Serving on http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            return 200, dict(self.stats.snapshot(), stages=TRACER.snapshot())
+        if path != "/predict":
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST for /predict"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+
+        start = time.perf_counter()
+        try:
+            if isinstance(payload, dict):
+                result = await self.batcher.submit(payload)
+            elif isinstance(payload, list) and all(isinstance(r, dict) for r in payload):
+                result = list(await asyncio.gather(*(self.batcher.submit(r) for r in payload)))
+            else:
+                return 400, {"error": "Body must be a listing object or a list of them"}
+        except ValueError as e:
+            self.stats.record(time.perf_counter() - start, ok=False)
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.stats.record(time.perf_counter() - start, ok=False)
+            return 500, {"error": str(e)}
+        self.stats.record(time.perf_counter() - start)
+        return 200, result
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._dispatch(method.upper(), target.split("?", 1)[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, default=_json_default).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the investment classifier over HTTP.")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=SERVE_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVE_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    server = ScoringServer(args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
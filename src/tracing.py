@@ -0,0 +1,180 @@
+# src/tracing.py
+import functools
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.config import TRACE_EXPORT_PATH, TRACING_ENABLED
+
+# Durations are bucketed by bit length of the nanosecond count: bucket b holds [2**(b-1), 2**b) ns
+_N_BUCKETS = 64
+
+
+class _Histogram:
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * _N_BUCKETS
+
+    def add(self, ns: int) -> None:
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min(ns.bit_length(), _N_BUCKETS - 1)] += 1
+
+    def quantile_ns(self, q: float) -> int:
+        """Upper edge of the bucket holding the q-quantile (at most 2x the true value)."""
+        rank = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(1 << b, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else None,
+            "min_ms": self.min_ns / 1e6 if self.min_ns is not None else None,
+            "max_ms": self.max_ns / 1e6,
+            "p50_ms": self.quantile_ns(0.5) / 1e6,
+            "p99_ms": self.quantile_ns(0.99) / 1e6,
+            "buckets_ns": {str(1 << b): n for b, n in enumerate(self.buckets) if n},
+        }
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """In-process stage timings (``span``) and ``counters``, aggregated into histograms.
+
+    With tracing disabled ``span`` hands back a shared no-op context manager
+    and ``incr`` returns immediately, so instrumented code costs one attribute
+    check per call.
+    """
+
+    def __init__(self, enabled: bool = TRACING_ENABLED):
+        self.enabled = enabled
+        self._spans: Dict[str, _Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name: str, ns: int) -> None:
+        with self._lock:
+            hist = self._spans.get(name)
+            if hist is None:
+                hist = self._spans[name] = _Histogram()
+            hist.add(ns)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator form of ``span``; the span defaults to ``module.function``."""
+        def decorate(fn):
+            span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+        return decorate
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "spans": {name: hist.to_dict() for name, hist in sorted(self._spans.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def export_json(self, path=TRACE_EXPORT_PATH) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def export_mlflow(self, prefix: str = "trace") -> None:
+        """Log mean/p99 per span and every counter as metrics of the active MLflow run."""
+        import mlflow
+
+        snap = self.snapshot()
+        metrics = {}
+        for name, stats in snap["spans"].items():
+            key = _metric_key(f"{prefix}.{name}")
+            metrics[f"{key}.mean_ms"] = stats["mean_ms"]
+            metrics[f"{key}.p99_ms"] = stats["p99_ms"]
+            metrics[f"{key}.count"] = stats["count"]
+        for name, value in snap["counters"].items():
+            metrics[_metric_key(f"{prefix}.{name}")] = value
+        if metrics:
+            mlflow.log_metrics(metrics)
+
+
+def _metric_key(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_\-./ ]", "_", name)
+
+
+TRACER = Tracer()
+span = TRACER.span
+incr = TRACER.incr
+traced = TRACER.traced
@@ -1,34 +1,189 @@
 import pandas as pd
 import numpy as np
-import mlflow
-import mlflow.sklearn
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.preprocessing import LabelEncoder
 import os
+import sys
+import json
+import time
+import tempfile
 import joblib
 
+from src import data_cache
+from src.artifacts import file_sha256
+from src.city_medians import CityMedianTable
+from src.config import (CITY_MEDIAN_FALLBACK, CATEGORICAL_COLUMNS, NUMERIC_DTYPES, TRAIN_CHUNK_SIZE, MODEL_BACKEND,
+                        PEER_FEATURES_ENABLED, SERVE_N_JOBS)
+from src.compact_model import CompactForest, check_parity, is_exportable
+from src.encoding import EncodingTable
+from src.model_index import (DEFAULT_EXPERIMENT, DEFAULT_METRIC, MODEL_NAME, make_entry, preprocessing_fingerprint,
+                             record_model)
+from src.peer_index import PeerIndex
+from src.tracing import TRACER, span, traced
+
 DATA_PATH = "data/india_housing_prices.csv"
-MLFLOW_TRACKING_URI = "mlruns"  
-mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
-mlflow.set_experiment("real_estate_investment_model")
-
-def load_data():
-    if not os.path.exists(DATA_PATH):
-        raise FileNotFoundError(f"Dataset not found at {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
+CITY_MEDIANS_PATH = "models/city_medians.json"
+ENCODING_TABLE_PATH = "models/encoding_tables.json"
+FEATURES_PATH = "models/feature_columns.json"
+MODEL_PATH = "models/rf_investment_model.joblib"
+COMPACT_MODEL_PATH = "models/compact_model.npz"
+MODEL_INDEX_PATH = "models/model_index.json"
+PEER_INDEX_PATH = "models/peer_index.npz"
+MLFLOW_TRACKING_URI = "mlruns"
+_mlflow = None
+
+def configure_mlflow():
+    """Import mlflow and point it at ``MLFLOW_TRACKING_URI``/``DEFAULT_EXPERIMENT``; done once, on first use."""
+    global _mlflow
+    if _mlflow is None:
+        import mlflow
+        import mlflow.sklearn
+
+        mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+        mlflow.set_experiment(DEFAULT_EXPERIMENT)
+        _mlflow = mlflow
+    return _mlflow
+
+def csv_dtypes(columns=None):
+    dtypes = dict(NUMERIC_DTYPES)
+    dtypes.update({c: "category" for c in CATEGORICAL_COLUMNS})
+    if columns is not None:
+        dtypes = {c: t for c, t in dtypes.items() if c in columns}
+    return dtypes
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def read_csv_typed(path=DATA_PATH):
+    columns = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(path, dtype=csv_dtypes(columns))
+
+@traced("train.load_data")
+def load_data(path=DATA_PATH, use_cache=True):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset not found at {path}")
+    df = data_cache.load_frame(path) if use_cache else None
+    if df is None:
+        df = read_csv_typed(path)
     print(f"Loaded data: {df.shape[0]} rows, {df.shape[1]} columns")
     return df
 
-def apply_labeling_option_B(df):
+def _scan_vocabularies_and_medians(path, columns, chunksize):
+    cat_cols = [c for c in columns if c in CATEGORICAL_COLUMNS]
+    usecols = list(dict.fromkeys(cat_cols + ["City", "State", "Price_per_SqFt"]).keys())
+    usecols = [c for c in usecols if c in columns]
+
+    vocab = {c: set() for c in cat_cols}
+    group_ids = {"City": {}, "State": {}}
+    group_codes = {"City": [], "State": []}
+    pps_parts = []
+    n_rows = 0
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=csv_dtypes(usecols), chunksize=chunksize):
+        n_rows += len(chunk)
+        for col in cat_cols:
+            vocab[col].update(chunk[col].astype(str).unique())
+        for col, ids in group_ids.items():
+            if col not in chunk.columns:
+                continue
+            values = chunk[col].astype(str)
+            for v in values.unique():
+                ids.setdefault(v, len(ids))
+            group_codes[col].append(values.map(ids).to_numpy(np.int32))
+        pps_parts.append(chunk["Price_per_SqFt"].to_numpy(np.float32))
+
+    pps = np.concatenate(pps_parts) if pps_parts else np.empty(0, np.float32)
+    medians = {}
+    for col, ids in group_ids.items():
+        if not group_codes[col]:
+            medians[col] = {}
+            continue
+        by_code = pd.Series(pps).groupby(np.concatenate(group_codes[col])).median()
+        names = np.empty(len(ids), dtype=object)
+        for name, code in ids.items():
+            names[code] = name
+        medians[col] = {names[code]: float(m) for code, m in by_code.items()}
+
+    city_medians = CityMedianTable(
+        medians["City"], medians["State"], float(np.nanmedian(pps)) if len(pps) else 0.0,
+        fallback=CITY_MEDIAN_FALLBACK, metadata={"n_rows": n_rows},
+    )
+    encoding = EncodingTable({c: sorted(v) for c, v in vocab.items()})
+    return n_rows, city_medians, encoding
+
+def option_b_labels(price_per_sqft, city_median):
+    """Option B: a good investment is priced more than 10% below its city's median Price_per_SqFt."""
+    return price_per_sqft < city_median * np.float32(0.90)
+
+def encode_chunk(chunk, columns, encoding, city_medians, out=None):
+    """Encode raw rows into the float32 training layout (``columns`` + City_Median) and Option B labels."""
+    if out is None:
+        out = (np.empty((len(chunk), len(columns) + 1), dtype=np.float32), np.empty(len(chunk), dtype=np.int8))
+    X, y = out
+    for j, col in enumerate(columns):
+        if col in encoding.vocabularies:
+            X[:, j] = encoding.encode_column(col, chunk[col])
+        else:
+            X[:, j] = pd.to_numeric(chunk[col], errors="coerce").to_numpy(np.float32, na_value=np.nan)
+    median = city_medians.map(chunk["City"]).to_numpy(np.float32)
+    X[:, -1] = median
+    y[:] = option_b_labels(chunk["Price_per_SqFt"].to_numpy(np.float32), median)
+    return X, y
+
+@traced("train.load_training_matrix")
+def load_training_matrix(path=DATA_PATH, chunksize=TRAIN_CHUNK_SIZE, use_cache=True):
+    """Stream the CSV into an encoded float32 training matrix.
+
+    Pass 1 reads only the categorical and price columns to collect vocabularies
+    and exact City/State medians; pass 2 encodes each chunk straight into a
+    preallocated matrix, so no full-size intermediate DataFrame is built.
+    When ``python -m src.data_cache`` has cached this CSV the matrix is
+    memory-mapped from disk instead. Returns ``(X, y, city_medians, encoding, stats)``.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset not found at {path}")
+    cached = data_cache.load_feature_matrix(path) if use_cache else None
+    if cached is not None:
+        cached[4]["peak_rss_mb"] = peak_memory_mb()
+        print(f"Loaded training matrix from cache {cached[4]['cache']}: {cached[4]['rows']} rows")
+        return cached
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    if "City" not in columns or "Price_per_SqFt" not in columns:
+        raise ValueError("Required columns missing: City, Price_per_SqFt")
+
+    n_rows, city_medians, encoding = _scan_vocabularies_and_medians(path, columns, chunksize)
+    feature_columns = columns + ["City_Median"]
+    X = np.empty((n_rows, len(feature_columns)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=np.int8)
+
+    start = 0
+    for chunk in pd.read_csv(path, dtype=csv_dtypes(columns), chunksize=chunksize):
+        stop = start + len(chunk)
+        encode_chunk(chunk, columns, encoding, city_medians, out=(X[start:stop], y[start:stop]))
+        start = stop
+
+    stats = {"rows": n_rows, "matrix_mb": X.nbytes / (1024 * 1024), "peak_rss_mb": peak_memory_mb()}
+    print(f"Loaded training matrix: {n_rows} rows, {len(feature_columns)} features "
+          f"({stats['matrix_mb']:.1f} MB, peak RSS {stats['peak_rss_mb']} MB)")
+    return (pd.DataFrame(X, columns=feature_columns, copy=False),
+            pd.Series(y, name="Good_Investment"), city_medians, encoding, stats)
+
+@traced("train.apply_labeling_option_B")
+def apply_labeling_option_B(df, medians_path=None):
     df = df.copy()
 
     if "City" not in df.columns or "Price_per_SqFt" not in df.columns:
         raise ValueError("Required columns missing: City, Price_per_SqFt")
 
-    city_medians = df.groupby("City")["Price_per_SqFt"].median()
-    df["City_Median"] = df["City"].map(city_medians)
+    city_medians = CityMedianTable.from_frame(df, fallback=CITY_MEDIAN_FALLBACK)
+    df["City_Median"] = df["City"].astype(str).map(city_medians.city_medians).astype("float64")
 
     df["Good_Investment"] = (df["Price_per_SqFt"] < (df["City_Median"] * 0.90)).astype(int)
 
@@ -36,52 +191,370 @@ def apply_labeling_option_B(df):
 
     if df["Good_Investment"].nunique() < 2:
         print("WARNING: Still only one class after Option B labeling.")
+
+    if medians_path is not None:
+        city_medians.save(medians_path)
+        print(f"City median table saved at {medians_path}")
     return df
-def encode_data(df):
+@traced("train.encode_data")
+def encode_data(df, tables_path=None):
     df = df.copy()
     label_encoders = {}
-    for col in df.select_dtypes(include=["object"]).columns:
+    for col in df.select_dtypes(include=["object", "category"]).columns:
         le = LabelEncoder()
         df[col] = le.fit_transform(df[col].astype(str))
         label_encoders[col] = le
+
+    if tables_path is not None:
+        EncodingTable.from_label_encoders(label_encoders).save(tables_path)
+        print(f"Encoding table saved at {tables_path}")
     return df, label_encoders
-def train_model(df):
-    if "Good_Investment" not in df.columns:
-        raise ValueError("Label Good_Investment missing from DF")
+MODEL_BACKENDS = ("rf", "lightgbm", "hgb")
+# HistGradientBoosting only accepts categorical codes below max_bins (255)
+MAX_NATIVE_CATEGORIES = 255
+
+def native_categorical_columns(X, max_categories=MAX_NATIVE_CATEGORIES):
+    return [c for c in X.columns if c in CATEGORICAL_COLUMNS and X[c].max() < max_categories]
+
+def build_model(backend=MODEL_BACKEND, categorical_columns=None, n_jobs=-1):
+    if backend == "rf":
+        return RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=n_jobs)
+    if backend == "lightgbm":
+        from lightgbm import LGBMClassifier
+        return LGBMClassifier(n_estimators=300, learning_rate=0.05, num_leaves=63, random_state=42,
+                              n_jobs=n_jobs, verbose=-1)
+    if backend == "hgb":
+        return HistGradientBoostingClassifier(categorical_features=categorical_columns or None, random_state=42)
+    raise ValueError(f"Unknown model backend {backend!r}; expected one of {MODEL_BACKENDS}")
+
+def for_serving(model, n_jobs=SERVE_N_JOBS):
+    """Set the thread count a fitted model predicts with before it is saved, logged or exported."""
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+    return model
+
+def _fit_params(backend, categorical_columns):
+    if backend == "lightgbm" and categorical_columns:
+        return {"categorical_feature": categorical_columns}
+    return {}
+
+def model_size_mb(model):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.joblib")
+        joblib.dump(model, path)
+        return os.path.getsize(path) / (1024 * 1024)
 
-    X = df.drop(["Good_Investment"], axis=1)
-    y = df["Good_Investment"]
+def per_row_latency_ms(model, X, n_rows=200):
+    rows = X.iloc[:n_rows]
+    timings = []
+    for i in range(len(rows)):
+        start = time.perf_counter()
+        model.predict_proba(rows.iloc[i:i + 1])
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000) if timings else None
+
+CV_FOLDS = 5
+# Boosting backends stop after this many rounds without improvement on an inner validation split
+EARLY_STOPPING_ROUNDS = 20
+
+def _fit_with_early_stopping(model, backend, X, y, categorical_columns, rounds):
+    """Fit, holding out 10% of ``X`` for early stopping on boosting backends; returns iterations used."""
+    params = _fit_params(backend, categorical_columns)
+    if backend == "hgb" and rounds:
+        model.set_params(early_stopping=True, n_iter_no_change=rounds, validation_fraction=0.1)
+        model.fit(X, y, **params)
+        return int(model.n_iter_)
+    if backend == "lightgbm" and rounds:
+        from lightgbm import early_stopping
+
+        X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=0.1, random_state=42, stratify=y)
+        model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], callbacks=[early_stopping(rounds, verbose=False)],
+                  **params)
+        return int(model.best_iteration_ or model.n_estimators)
+    model.fit(X, y, **params)
+    return int(getattr(model, "n_estimators", 0) or 0) or None
+
+def _cv_fold(spec):
+    """Worker: attach to the shared training matrix, fit one fold and report its metrics."""
+    from multiprocessing import shared_memory
+    from threadpoolctl import threadpool_limits
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    X_shm = shared_memory.SharedMemory(name=spec["X_name"])
+    y_shm = shared_memory.SharedMemory(name=spec["y_name"])
+    try:
+        X_all = np.ndarray(spec["X_shape"], dtype=np.float32, buffer=X_shm.buf)
+        y_all = np.ndarray(spec["X_shape"][:1], dtype=np.int8, buffer=y_shm.buf)
+        test_idx = spec["test_idx"]
+        train_mask = np.ones(len(y_all), dtype=bool)
+        train_mask[test_idx] = False
+        X_train = pd.DataFrame(X_all[train_mask], columns=spec["columns"], copy=False)
+        X_test = pd.DataFrame(X_all[test_idx], columns=spec["columns"], copy=False)
+        y_train, y_test = y_all[train_mask], y_all[test_idx]
+
+        with threadpool_limits(spec["threads"]):
+            categorical_columns = (native_categorical_columns(X_train)
+                                   if spec["backend"] in ("lightgbm", "hgb") else [])
+            model = build_model(spec["backend"], categorical_columns, n_jobs=spec["threads"])
+            start = time.perf_counter()
+            iterations = _fit_with_early_stopping(model, spec["backend"], X_train, y_train, categorical_columns,
+                                                  spec["early_stopping_rounds"])
+            fit_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            proba = model.predict_proba(X_test)[:, 1]
+            predict_seconds = time.perf_counter() - start
+
+        preds = (proba >= 0.5).astype(np.int8)
+        return {
+            "fold": spec["fold"],
+            "accuracy": float(accuracy_score(y_test, preds)),
+            "f1": float(f1_score(y_test, preds, zero_division=0)),
+            "roc_auc": float(roc_auc_score(y_test, proba)) if len(np.unique(y_test)) > 1 else None,
+            "fit_seconds": fit_seconds,
+            "predict_seconds": predict_seconds,
+            "iterations": iterations,
+            "peak_rss_mb": peak_memory_mb(),
+        }
+    finally:
+        X_shm.close()
+        y_shm.close()
+
+@traced("train.cross_validate_model")
+def cross_validate_model(X, y, backend=None, n_splits=CV_FOLDS, n_workers=None, threads_per_fold=None,
+                         early_stopping_rounds=EARLY_STOPPING_ROUNDS, log_to_mlflow=True):
+    """Stratified k-fold evaluation with folds fitted in parallel worker processes.
+
+    The encoded matrix is copied once into shared memory and every worker maps
+    it instead of receiving a pickled DataFrame. Each fold runs under a
+    ``threads_per_fold`` BLAS/OpenMP budget (defaults to cores / workers).
+    Per-fold metrics are logged to the active MLflow run with ``step=fold``.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context, shared_memory
+    from sklearn.model_selection import StratifiedKFold
+
+    backend = backend or MODEL_BACKEND
+    n_workers = n_workers or min(n_splits, os.cpu_count() or 1)
+    threads = threads_per_fold or max(1, (os.cpu_count() or 1) // n_workers)
+    columns = list(X.columns)
+    X_arr = np.ascontiguousarray(X.to_numpy(dtype=np.float32, copy=False))
+    y_arr = np.ascontiguousarray(np.asarray(y, dtype=np.int8))
+
+    X_shm = shared_memory.SharedMemory(create=True, size=max(X_arr.nbytes, 1))
+    y_shm = shared_memory.SharedMemory(create=True, size=max(y_arr.nbytes, 1))
+    try:
+        np.ndarray(X_arr.shape, dtype=np.float32, buffer=X_shm.buf)[:] = X_arr
+        np.ndarray(y_arr.shape, dtype=np.int8, buffer=y_shm.buf)[:] = y_arr
+        del X_arr
+
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+        specs = [
+            {"fold": i, "X_name": X_shm.name, "y_name": y_shm.name, "X_shape": (len(y_arr), len(columns)),
+             "columns": columns, "test_idx": test_idx.astype(np.int64), "backend": backend, "threads": threads,
+             "early_stopping_rounds": early_stopping_rounds}
+            for i, (_, test_idx) in enumerate(splitter.split(np.zeros(len(y_arr)), y_arr))
+        ]
+        start = time.perf_counter()
+        if n_workers == 1:
+            folds = [_cv_fold(spec) for spec in specs]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context("spawn")) as pool:
+                folds = list(pool.map(_cv_fold, specs))
+        wall_seconds = time.perf_counter() - start
+    finally:
+        X_shm.close()
+        X_shm.unlink()
+        y_shm.close()
+        y_shm.unlink()
+
+    summary = {
+        "backend": backend,
+        "n_splits": n_splits,
+        "n_workers": n_workers,
+        "threads_per_fold": threads,
+        "wall_seconds": wall_seconds,
+        "folds": folds,
+    }
+    for key in ("accuracy", "f1", "roc_auc", "fit_seconds"):
+        values = [f[key] for f in folds if f[key] is not None]
+        if values:
+            summary[f"{key}_mean"] = float(np.mean(values))
+            summary[f"{key}_std"] = float(np.std(values))
+    peaks = [f["peak_rss_mb"] for f in folds if f["peak_rss_mb"] is not None]
+    summary["peak_rss_mb_max"] = max(peaks) if peaks else None
+    print(f"CV {n_splits} folds ({n_workers} workers x {threads} threads) in {wall_seconds:.1f}s: "
+          f"accuracy {summary['accuracy_mean']:.4f} +/- {summary['accuracy_std']:.4f}")
+
+    if log_to_mlflow:
+        mlflow = configure_mlflow()
+        mlflow.log_params({"cv_folds": n_splits, "cv_workers": n_workers, "cv_threads_per_fold": threads,
+                           "early_stopping_rounds": early_stopping_rounds})
+        for f in folds:
+            for key in ("accuracy", "f1", "roc_auc", "fit_seconds", "predict_seconds", "iterations", "peak_rss_mb"):
+                if f[key] is not None:
+                    mlflow.log_metric(f"cv_{key}", f[key], step=f["fold"])
+        mlflow.log_metrics({f"cv_{k}": v for k, v in summary.items()
+                            if k.endswith(("_mean", "_std", "_max")) and v is not None})
+        mlflow.log_metric("cv_wall_seconds", wall_seconds)
+    return summary
+
+def train_model(df, extra_metrics=None, backend=None, cv_folds=None, y=None):
+    """Fit and log one model. Pass the labels as ``y`` to use ``df`` as the feature matrix without copying it."""
+    backend = backend or MODEL_BACKEND
+    if y is not None:
+        X = df
+    elif "Good_Investment" not in df.columns:
+        raise ValueError("Label Good_Investment missing from DF")
+    else:
+        X = df.drop(["Good_Investment"], axis=1)
+        y = df["Good_Investment"]
 
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
 
-    model = RandomForestClassifier(n_estimators=200, random_state=42)
+    categorical_columns = native_categorical_columns(X) if backend in ("lightgbm", "hgb") else []
+    model = build_model(backend, categorical_columns)
 
+    mlflow = configure_mlflow()
     with mlflow.start_run():
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
+        if cv_folds:
+            cross_validate_model(X, y, backend, n_splits=cv_folds)
+        start = time.perf_counter()
+        with span("train.fit"):
+            model.fit(X_train, y_train, **_fit_params(backend, categorical_columns))
+        train_seconds = time.perf_counter() - start
+        with span("train.evaluate"):
+            preds = model.predict(X_test)
+        # Fitted and evaluated with every core; measured, logged and saved with the serving thread count
+        for_serving(model)
 
         acc = accuracy_score(y_test, preds)
         print("Accuracy:", acc)
         print(classification_report(y_test, preds))
 
+        size_mb = model_size_mb(model)
+        latency_ms = per_row_latency_ms(model, X_test)
+        print(f"Backend {backend}: trained in {train_seconds:.1f}s, {size_mb:.1f} MB on disk, "
+              f"{latency_ms:.2f} ms per single-row predict_proba")
+
+        mlflow.log_param("backend", backend)
+        mlflow.log_param("native_categorical_columns", ",".join(categorical_columns))
         mlflow.log_metric("accuracy", acc)
-        mlflow.sklearn.log_model(model, "rf_investment_model")
+        mlflow.log_metric("train_seconds", train_seconds)
+        mlflow.log_metric("model_size_mb", size_mb)
+        if latency_ms is not None:
+            mlflow.log_metric("predict_row_ms", latency_ms)
+        for name, value in (extra_metrics or {}).items():
+            if value is not None:
+                mlflow.log_metric(name, value)
+        peak = peak_memory_mb()
+        if peak is not None:
+            mlflow.log_metric("peak_rss_mb", peak)
+            print(f"Peak RSS: {peak:.1f} MB")
+        TRACER.export_mlflow()
+        info = mlflow.sklearn.log_model(model, MODEL_NAME)
+        index_logged_model(info, acc, backend, feature_columns=list(X.columns))
 
     return model
 
-def train_all():
-    df = load_data()
-    df = apply_labeling_option_B(df)
+def index_logged_model(info, metric_value, backend=None, path=MODEL_INDEX_PATH, experiment=DEFAULT_EXPERIMENT,
+                       metric=DEFAULT_METRIC, feature_columns=None):
+    """Record a logged model in models/model_index.json so predict.py can resolve it without scanning mlruns.
 
-    if df["Good_Investment"].nunique() < 2:
+    Call it after the run's encoding tables, city medians and peer index are
+    saved: their hashes are recorded with ``feature_columns`` so the entry is
+    only served next to those files.
+    """
+    from mlflow.utils.file_utils import local_file_uri_to_path
+
+    local_path = None
+    try:
+        location = configure_mlflow().get_logged_model(info.model_id).artifact_location
+        if location.startswith("file:") or "://" not in location:
+            local_path = local_file_uri_to_path(location)
+    except Exception:
+        pass
+    metric_value = float(metric_value) if metric_value is not None else None
+    entry = make_entry(info.run_id, info.model_uri, local_path, metric_value, model_id=info.model_id,
+                       backend=backend, index_path=path, feature_columns=feature_columns,
+                       artifacts=preprocessing_fingerprint(os.path.dirname(path) or "."))
+    exp = record_model(entry, experiment, metric, path=path)
+    if entry["run_id"] in exp["runs"]:
+        print(f"Indexed {info.model_uri} in {path} (best {exp['metric']}: {exp['best']['metric']})")
+
+def train_all(backend=None, cv_folds=None, peer_features=None):
+    from src.incremental import IncrementalState
+
+    start = time.perf_counter()
+    X, y, city_medians, encoding, load_stats = load_training_matrix()
+    print("Label counts:\n", y.value_counts())
+
+    if y.nunique() < 2:
         raise ValueError("Labeling still producing only 1 class. Fix dataset distribution.")
 
-    df_encoded, _ = encode_data(df)
-    clf = train_model(df_encoded)
     os.makedirs("models", exist_ok=True)
-    joblib.dump(clf, "models/rf_investment_model.joblib")
-    print("Model saved at models/rf_investment_model.joblib")
+    city_medians.save(CITY_MEDIANS_PATH)
+    encoding.save(ENCODING_TABLE_PATH)
+    with span("train.peer_index"):
+        peer_index = PeerIndex.from_matrix(X)
+    peer_index.save(PEER_INDEX_PATH)
+    print(f"Peer index saved at {PEER_INDEX_PATH} ({len(peer_index.keys[-1])} segments)")
+    if PEER_FEATURES_ENABLED if peer_features is None else peer_features:
+        X = pd.concat([X, peer_index.features(X)], axis=1)
+    feature_columns = list(X.columns)
+
+    clf = train_model(
+        X,
+        y=y,
+        extra_metrics={"load_peak_rss_mb": load_stats["peak_rss_mb"], "train_matrix_mb": load_stats["matrix_mb"]},
+        backend=backend,
+        cv_folds=cv_folds,
+    )
+    joblib.dump(clf, MODEL_PATH)
+    with open(FEATURES_PATH, "w", encoding="utf-8") as f:
+        json.dump(feature_columns, f, indent=2)
+    print(f"Model saved at {MODEL_PATH}")
+    export_compact_model(clf, X.head(1000))
+    # Baseline for `--incremental` runs: watermark, grouped prices, reservoir and full refit time
+    IncrementalState.from_training(X, y, encoding, DATA_PATH, backend or MODEL_BACKEND,
+                                   time.perf_counter() - start).save()
+    print(f"Stage timings saved at {TRACER.export_json()}")
+
+@traced("train.export_compact_model")
+def export_compact_model(model, X_check=None, path=COMPACT_MODEL_PATH, source_path=MODEL_PATH):
+    """Write the array export of a tree ensemble next to its joblib, after a predict_proba parity check."""
+    if not is_exportable(model):
+        if os.path.exists(path):
+            os.remove(path)
+        print(f"Skipping compact export: {type(model).__name__} is not a sklearn tree ensemble")
+        return None
+    compact = CompactForest.from_sklearn(model, source_sha256=file_sha256(source_path))
+    if X_check is not None:
+        diff = check_parity(model, compact, X_check)
+        if diff > 1e-9:
+            raise RuntimeError(f"Compact model disagrees with {type(model).__name__} (max |dp| = {diff:.3g})")
+    compact.save(path)
+    print(f"Compact model saved at {path}")
+    return compact
+
 if __name__ == "__main__":
-    train_all()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the investment classifier.")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, default=MODEL_BACKEND)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fold rows appended since the last run into the saved model instead of refitting")
+    parser.add_argument("--strategy", choices=("warm_start", "reservoir"), default=None)
+    parser.add_argument("--new-trees", type=int, default=None)
+    parser.add_argument("--peer-features", action=argparse.BooleanOptionalAction, default=None,
+                        help="Train on Locality_Relative_Price / Peer_Price_Percentile (default: PEER_FEATURES_ENABLED)")
+    parser.add_argument("--cv", type=int, default=None, metavar="K",
+                        help="Also run K-fold cross-validation in parallel worker processes before the final fit")
+    args = parser.parse_args()
+    if args.incremental:
+        from src.incremental import retrain_incremental
+
+        retrain_incremental(strategy=args.strategy, new_trees=args.new_trees)
+    else:
+        train_all(args.backend, args.cv, args.peer_features)
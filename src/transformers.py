@@ -1,38 +1,67 @@
 # src/transformers.py
+import warnings
+
 import numpy as np
 import pandas as pd
-from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.utils._set_output import _get_output_config
+
+from src.feature_engineering import price_per_sqft
+
 class OutlierFlagger(BaseEstimator, TransformerMixin):
     def __init__(self, numeric_cols=None, threshold=3.0):
         self.numeric_cols = numeric_cols
         self.threshold = threshold
+
+    def _column_stats(self, X, cols):
+        values = X[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            return np.nanmean(values, axis=0), np.nanstd(values, axis=0, ddof=1)
+
     def fit(self, X, y=None):
+        cols = self.numeric_cols if self.numeric_cols is not None else X.select_dtypes(include=np.number).columns
+        self.columns_ = [c for c in cols if c in X.columns]
+        self.mean_, self.std_ = self._column_stats(X, self.columns_)
         return self
+
+    def _flag_matrix(self, X):
+        if hasattr(self, "mean_"):
+            present = [i for i, c in enumerate(self.columns_) if c in X.columns]
+            cols = [self.columns_[i] for i in present]
+            mean, std = self.mean_[present], self.std_[present]
+        else:
+            # Pipelines pickled before fit() learned statistics fall back to per-batch stats.
+            cols = self.numeric_cols if self.numeric_cols is not None else X.select_dtypes(include=np.number).columns
+            cols = [c for c in cols if c in X.columns]
+            mean, std = self._column_stats(X, cols)
+
+        values = X[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            flags = (np.abs(values - mean) > self.threshold * std) & (std > 0)
+        return [f"{col}_outlier" for col in cols], flags.astype(np.int64)
+
     def transform(self, X):
-        X_ = X.copy()
-        cols = self.numeric_cols if self.numeric_cols is not None else X_.select_dtypes(include=np.number).columns
-        for col in cols:
-            if col in X_.columns:
-                std = X_[col].std()
-                if pd.isna(std) or std == 0:
-                    X_[f"{col}_outlier"] = 0
-                else:
-                    X_[f"{col}_outlier"] = ((X_[col] - X_[col].mean()).abs() > self.threshold * std).astype(int)
+        flag_names, flags = self._flag_matrix(X)
+        # A shallow copy shares X's column data; only the flag block is newly allocated
+        stale = [c for c in flag_names if c in X.columns]
+        X_ = X.drop(columns=stale) if stale else X.copy(deep=False)
+        if flag_names:
+            X_[flag_names] = flags
         return X_
 
 class PricePerSqftAdder(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         return self
 
+    def __sklearn_is_fitted__(self):
+        return True
+
     def transform(self, X):
         X_ = X.copy()
         if "Price_in_Lakhs" in X_.columns and "Size_in_SqFt" in X_.columns:
-            with np.errstate(divide="ignore", invalid="ignore"):
-                X_["Price_per_SqFt"] = np.where(
-                    (X_["Size_in_SqFt"] > 0),
-                    (X_["Price_in_Lakhs"] * 100000) / X_["Size_in_SqFt"],
-                    np.nan
-                )
+            X_["Price_per_SqFt"] = price_per_sqft(X_["Price_in_Lakhs"].to_numpy(np.float64, na_value=np.nan),
+                                                  X_["Size_in_SqFt"].to_numpy(np.float64, na_value=np.nan))
         return X_
 
 class AgeCalculator(BaseEstimator, TransformerMixin):
@@ -42,6 +71,9 @@ class AgeCalculator(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         return self
 
+    def __sklearn_is_fitted__(self):
+        return True
+
     def transform(self, X):
         X_ = X.copy()
         if "Year_Built" in X_.columns:
@@ -52,3 +84,86 @@ class AgeCalculator(BaseEstimator, TransformerMixin):
                     np.nan
                 )
         return X_
+
+
+class DerivedFeatures(BaseEstimator, TransformerMixin):
+    """OutlierFlagger, PricePerSqftAdder and AgeCalculator fused into one pass.
+
+    Produces the same columns, in the same order, as the three-step chain but
+    builds the output frame once from the input's column arrays instead of
+    copying the whole frame at every step. Follows ``set_output`` like other
+    sklearn transformers: an array by default, a DataFrame with
+    ``set_output(transform="pandas")``.
+    """
+
+    def __init__(self, numeric_cols=None, threshold=3.0, current_year=2025):
+        self.numeric_cols = numeric_cols
+        self.threshold = threshold
+        self.current_year = current_year
+
+    def fit(self, X, y=None):
+        self.flagger_ = OutlierFlagger(numeric_cols=self.numeric_cols, threshold=self.threshold).fit(X)
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _output_names(self, columns, flag_names):
+        names = [c for c in columns if c not in flag_names] + list(flag_names)
+        if {"Price_in_Lakhs", "Size_in_SqFt"} <= set(columns) and "Price_per_SqFt" not in names:
+            names.append("Price_per_SqFt")
+        if "Year_Built" in columns and "Age_of_Property" not in names:
+            names.append("Age_of_Property")
+        return names
+
+    def transform(self, X):
+        flag_names, flags = self.flagger_._flag_matrix(X)
+        columns = {c: X[c] for c in X.columns if c not in flag_names}
+        for i, name in enumerate(flag_names):
+            columns[name] = flags[:, i]
+
+        if "Price_in_Lakhs" in X.columns and "Size_in_SqFt" in X.columns:
+            size = X["Size_in_SqFt"].to_numpy(dtype=np.float64, na_value=np.nan)
+            price = X["Price_in_Lakhs"].to_numpy(dtype=np.float64, na_value=np.nan)
+            columns["Price_per_SqFt"] = price_per_sqft(price, size)
+        if "Year_Built" in X.columns:
+            year = X["Year_Built"].to_numpy(dtype=np.float64, na_value=np.nan)
+            columns["Age_of_Property"] = self.current_year - year
+
+        names = self._output_names(list(X.columns), flag_names)
+        out = pd.DataFrame({name: columns[name] for name in names}, index=X.index, copy=False)
+        # TransformerMixin wraps the result for "pandas"/"polars"; "default" means a plain array
+        if _get_output_config("transform", self)["dense"] == "default":
+            return out.to_numpy()
+        return out
+
+    def get_feature_names_out(self, input_features=None):
+        columns = list(self.feature_names_in_ if input_features is None else input_features)
+        flag_names = [f"{c}_outlier" for c in self.flagger_.columns_ if c in columns]
+        return np.asarray(self._output_names(columns, flag_names), dtype=object)
+
+
+class SampledImputer(BaseEstimator, TransformerMixin):
+    """Fit ``imputer`` on at most ``sample_size`` random rows, then transform every row."""
+
+    def __init__(self, imputer, sample_size=20_000, random_state=None):
+        self.imputer = imputer
+        self.sample_size = sample_size
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        n_rows = X.shape[0]
+        if self.sample_size and n_rows > self.sample_size:
+            rows = np.random.default_rng(self.random_state).choice(n_rows, self.sample_size, replace=False)
+            rows.sort()
+            X = X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+        self.imputer_ = clone(self.imputer).fit(X)
+        self.n_features_in_ = self.imputer_.n_features_in_
+        if hasattr(self.imputer_, "feature_names_in_"):
+            self.feature_names_in_ = self.imputer_.feature_names_in_
+        return self
+
+    def transform(self, X):
+        return self.imputer_.transform(X)
+
+    def get_feature_names_out(self, input_features=None):
+        return self.imputer_.get_feature_names_out(input_features)
@@ -1,43 +1,201 @@
 # src/tune_optuna.py
-import optuna
-import joblib
+import argparse
+import json
+import multiprocessing
+import os
+
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import cross_val_score, KFold
-from xgboost import XGBRegressor
-from preprocessing import build_preprocessing
-from config import DATA_PATH, SEED
-from train import create_targets
+import scipy.sparse as sp
+from sklearn.model_selection import KFold
+from threadpoolctl import threadpool_limits
+
+from src import data_cache
+from src.preprocessing import build_preprocessing, check_output_for, describe_matrix
+from src.config import DATA_PATH, IMPUTATION_SAMPLE_SIZE, IMPUTATION_STRATEGY, MODEL_DIR, SEED
+from src.projection import TARGET, add_future_price, load_growth_rates
+from src.train import apply_labeling_option_B, load_data
+
+FEATURE_CACHE_DIR = MODEL_DIR / "optuna_cache"
+STUDY_NAME = "xgb_future_price"
+STORAGE_URL = f"sqlite:///{(MODEL_DIR / 'optuna_study.db').as_posix()}"
+N_SPLITS = 5
+# XGBoost reads the implicit zeros of sparse output as missing values, so tune on dense float32
+PREPROCESSING_OUTPUT = "float32"
+
+
+def _create_targets(df, rates=None):
+    return add_future_price(apply_labeling_option_B(df), rates)
+
+
+def _save_matrix(cache, X):
+    if sp.issparse(X):
+        X = X.tocsr()
+        np.save(cache / "X_data.npy", X.data)
+        np.save(cache / "X_indices.npy", X.indices)
+        np.save(cache / "X_indptr.npy", X.indptr)
+    else:
+        np.save(cache / "X.npy", np.asarray(X, dtype=np.float32))
+    info = describe_matrix(X)
+    with open(cache / "X_meta.json", "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def _load_matrix(cache):
+    with open(cache / "X_meta.json", "r", encoding="utf-8") as f:
+        info = json.load(f)
+    if info["format"] == "dense":
+        return np.load(cache / "X.npy", mmap_mode="r")
+    parts = [np.load(cache / f"X_{name}.npy", mmap_mode="r") for name in ("data", "indices", "indptr")]
+    return sp.csr_matrix(tuple(parts), shape=tuple(info["shape"]), copy=False)
+
+
+# Modules whose code shapes X_trans and y; editing them invalidates the feature cache
+_CACHE_SOURCES = ("preprocessing.py", "transformers.py", "projection.py")
+
+
+def _config_key(output, rates, data_path=DATA_PATH):
+    """Hash of everything besides the CSV that X_trans and y depend on: preprocessing settings, growth rates and code."""
+    config = {
+        "output": output,
+        "imputation": IMPUTATION_STRATEGY,
+        "imputation_sample_size": IMPUTATION_SAMPLE_SIZE,
+        "seed": SEED,
+        "target": TARGET,
+        "growth_rates": rates,
+        # The cleaned frame comes from data_cache, so its key covers the CSV typing and labelling code
+        "frame": data_cache.cache_key(data_path),
+    }
+    return data_cache.config_key(config, _CACHE_SOURCES)
+
 
-df = pd.read_csv(DATA_PATH)
-df = create_targets(df)
-X = df.drop(columns=["Good_Investment", "Future_Price_5yrs"])
-y = df["Future_Price_5yrs"]
+def prepare_features(data_path=DATA_PATH, n_splits=N_SPLITS, force=False, output=PREPROCESSING_OUTPUT):
+    """Fit the preprocessing once and cache X_trans, y and the fold indices as .npy files."""
+    check_output_for("xgboost", output)
+    rates = load_growth_rates()
+    key = _config_key(output, rates, data_path)
+    cache = FEATURE_CACHE_DIR / f"{data_cache.csv_hash(data_path)[:16]}_k{n_splits}_{output}_{key}"
+    if not force and (cache / "folds.npz").exists():
+        return cache
+    cache.mkdir(parents=True, exist_ok=True)
 
-preproc, *_ = build_preprocessing(df)
-preproc.fit(X, df["Good_Investment"])
-X_trans = preproc.transform(X)
+    df = _create_targets(load_data(data_path), rates)
+    X = df.drop(columns=["Good_Investment", TARGET])
+    preproc, *_ = build_preprocessing(df, TARGET, output=output)
+    X_trans = preproc.fit_transform(X, df["Good_Investment"])
 
-kf = KFold(n_splits=5, shuffle=True, random_state=SEED)
+    info = _save_matrix(cache, X_trans)
+    np.save(cache / "y.npy", df[TARGET].to_numpy(np.float32))
+    kf = KFold(n_splits=n_splits, shuffle=True, random_state=SEED)
+    folds = {}
+    for i, (train_idx, test_idx) in enumerate(kf.split(X_trans)):
+        folds[f"train_{i}"] = train_idx.astype(np.int32)
+        folds[f"test_{i}"] = test_idx.astype(np.int32)
+    # folds.npz is written last and doubles as the "cache complete" marker
+    np.savez(cache / "folds.npz", **folds)
+    print(f"Cached transformed features {X_trans.shape} ({info['format']}, {info['dtype']}, "
+          f"{info['nbytes'] / 2 ** 20:.1f} MB) at {cache}")
+    return cache
 
-def objective(trial):
+
+def load_features(cache):
+    X = _load_matrix(cache)
+    y = np.load(cache / "y.npy", mmap_mode="r")
+    with np.load(cache / "folds.npz") as f:
+        n_splits = len(f.files) // 2
+        folds = [(f[f"train_{i}"], f[f"test_{i}"]) for i in range(n_splits)]
+    return X, y, folds
+
+
+def objective(trial, X, y, folds, n_threads=1):
     params = {
         "n_estimators": trial.suggest_int("n_estimators", 200, 2000),
         "max_depth": trial.suggest_int("max_depth", 3, 12),
-        "learning_rate": trial.suggest_loguniform("learning_rate", 1e-3, 0.3),
+        "learning_rate": trial.suggest_float("learning_rate", 1e-3, 0.3, log=True),
         "subsample": trial.suggest_float("subsample", 0.5, 1.0),
         "colsample_bytree": trial.suggest_float("colsample_bytree", 0.3, 1.0),
         "reg_alpha": trial.suggest_float("reg_alpha", 0.0, 5.0),
         "reg_lambda": trial.suggest_float("reg_lambda", 0.0, 5.0),
         "random_state": SEED,
-        "verbosity": 0
+        "verbosity": 0,
+        "n_jobs": n_threads,
     }
-    model = XGBRegressor(**params)
-    scores = -cross_val_score(model, X_trans, y, scoring="neg_root_mean_squared_error", cv=kf, n_jobs=-1)
+    # optuna and xgboost are imported where used so importing this module stays cheap
+    import optuna
+    from xgboost import XGBRegressor
+
+    scores = []
+    # A sparse matrix cached before sparse output was rejected for XGBoost
+    check_output_for(XGBRegressor, "sparse" if sp.issparse(X) else "dense")
+    for fold, (train_idx, test_idx) in enumerate(folds):
+        model = XGBRegressor(**params)
+        model.fit(X[train_idx], y[train_idx])
+        pred = model.predict(X[test_idx])
+        scores.append(float(np.sqrt(np.mean((pred - y[test_idx]) ** 2))))
+        # Report the running mean so the pruner can stop a bad trial after any fold.
+        trial.report(float(np.mean(scores)), fold)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
     return float(np.mean(scores))
 
-study = optuna.create_study(direction="minimize")
-study.optimize(objective, n_trials=50, show_progress_bar=True)
 
-print("Best trial:", study.best_trial.params)
-joblib.dump(study, "models/optuna_study.pkl")
+def _make_pruner():
+    import optuna
+
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+
+
+def _run_worker(cache, n_trials, n_threads, storage, study_name, seed):
+    import optuna
+
+    X, y, folds = load_features(cache)
+    study = optuna.load_study(study_name=study_name, storage=storage, pruner=_make_pruner(),
+                              sampler=optuna.samplers.TPESampler(seed=seed))
+    with threadpool_limits(n_threads):
+        study.optimize(lambda trial: objective(trial, X, y, folds, n_threads), n_trials=n_trials)
+
+
+def run_study(n_trials=50, n_workers=1, threads_per_worker=None, storage=STORAGE_URL, study_name=STUDY_NAME,
+              data_path=DATA_PATH):
+    import optuna
+
+    cache = prepare_features(data_path)
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // n_workers)
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    study = optuna.create_study(direction="minimize", study_name=study_name, storage=storage,
+                                load_if_exists=True, pruner=_make_pruner())
+
+    share = [n_trials // n_workers + (1 if i < n_trials % n_workers else 0) for i in range(n_workers)]
+    if n_workers == 1:
+        _run_worker(cache, n_trials, threads, storage, study_name, SEED)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_run_worker, args=(cache, k, threads, storage, study_name, SEED + i))
+                   for i, k in enumerate(share) if k > 0]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        failed = [w.exitcode for w in workers if w.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(workers)} tuning workers failed (exit codes {failed}); "
+                               f"the study holds fewer than the {n_trials} requested trials")
+
+    study = optuna.load_study(study_name=study_name, storage=storage)
+    print("Best trial:", study.best_trial.params)
+    with open(MODEL_DIR / "optuna_best_params.json", "w", encoding="utf-8") as f:
+        json.dump({"value": study.best_value, "params": study.best_trial.params}, f, indent=2)
+    return study
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the future-price XGBoost regressor with Optuna.")
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="XGBoost/BLAS threads per worker (default: cpu_count // workers)")
+    parser.add_argument("--data", default=DATA_PATH, help="Housing CSV to tune on")
+    parser.add_argument("--storage", default=STORAGE_URL)
+    parser.add_argument("--study-name", default=STUDY_NAME)
+    args = parser.parse_args()
+    run_study(args.trials, args.workers, args.threads_per_worker, args.storage, args.study_name, args.data)
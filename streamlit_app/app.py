@@ -2,10 +2,31 @@
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
+import numpy as np
 import streamlit as st
-from src.predict import predict_from_dict
+from src.predict import artifact_versions, predict_from_dict, sensitivity_sweep, warm_up
 import plotly.graph_objects as go
 
+SWEEP_FIELDS = ["Price_in_Lakhs", "Size_in_SqFt", "Price_per_SqFt", "Year_Built", "Age_of_Property",
+                "BHK", "Floor_No", "Total_Floors", "Nearby_Schools", "Nearby_Hospitals"]
+
+
+# Artifacts are loaded once per server process; reruns only pay for scoring.
+@st.cache_resource(show_spinner="Loading model...")
+def load_artifacts():
+    return warm_up()
+
+
+# Cached scores are keyed on the artifact hashes too, so a hot-reloaded model is never served stale results
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_predict(input_dict, versions):
+    return predict_from_dict(input_dict)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def run_sweep(input_dict, field, start, stop, points, recompute_derived, versions):
+    return sensitivity_sweep(input_dict, field, np.linspace(start, stop, points), recompute_derived)
+
 # -------------------------
 # Page config and dark theme
 # -------------------------
@@ -85,6 +106,14 @@ h2, h3 {
 st.title("🏡 Real Estate Investment Advisor")
 st.markdown("Fill all fields. Defaults are examples from your sample data.")
 
+# Without a model the form still renders; scoring is skipped until one is trained
+try:
+    load_artifacts()
+    model_ready = True
+except FileNotFoundError as e:
+    model_ready = False
+    st.error(f"No trained model found. Run `python -m src.train` from the project root, then reload this page.\n\n{e}")
+
 # -------------------------
 # Property Form
 # -------------------------
@@ -132,7 +161,7 @@ with st.form("property_form"):
 # Prediction & Display
 # -------------------------
 if submitted:
-    input_dict = {
+    st.session_state["input_dict"] = {
         "ID": ID,
         "State": State,
         "City": City,
@@ -158,7 +187,11 @@ if submitted:
         "Availability_Status": Availability_Status
     }
 
-    result = predict_from_dict(input_dict)
+# Results live in session state so interacting with the sweep panel keeps them on screen
+if "input_dict" in st.session_state and model_ready:
+    input_dict = st.session_state["input_dict"]
+    versions = artifact_versions()
+    result = cached_predict(input_dict, versions)
 
     st.subheader("🏆 Prediction Result")
     if result["prediction"] == 1:
@@ -211,3 +244,41 @@ if submitted:
 
     st.markdown("### Input Features Received by Model")
     st.json(result["input_features"])
+
+    # -------------------------
+    # Sensitivity Sweep
+    # -------------------------
+    st.subheader("📈 Sensitivity Sweep")
+    st.markdown("Vary one field over a grid; all variants are scored in one batch.")
+    field = st.selectbox("Field to vary", SWEEP_FIELDS)
+    current = float(input_dict[field])
+    low, high = (current * 0.5, current * 1.5) if current > 0 else (0.0, 1.0)
+    col7, col8, col9 = st.columns(3)
+    with col7:
+        start = st.number_input("From", value=low, key=f"sweep_from_{field}")
+    with col8:
+        stop = st.number_input("To", value=high, key=f"sweep_to_{field}")
+    with col9:
+        points = st.slider("Points", min_value=10, max_value=500, value=100)
+    recompute = st.checkbox("Recompute Price_per_SqFt / Age_of_Property from the varied field", value=True)
+
+    sweep = run_sweep(input_dict, field, float(start), float(stop), int(points), recompute, versions)
+    if "probability_1" in sweep.columns:
+        sweep_fig = go.Figure(go.Scatter(
+            x=sweep[field], y=sweep["probability_1"] * 100, mode="lines",
+            line={'color': "#00f3ff", 'width': 3},
+        ))
+        sweep_fig.add_hline(y=50, line={'color': "white", 'dash': "dot"})
+        if start <= current <= stop:
+            sweep_fig.add_vline(x=current, line={'color': "#b14cff", 'dash': "dash"})
+        sweep_fig.update_layout(
+            xaxis_title=field,
+            yaxis_title="Good Investment Probability (%)",
+            yaxis={'range': [0, 100]},
+            paper_bgcolor="#0f111a",
+            plot_bgcolor="#0f111a",
+            font={'color': "white"},
+        )
+        st.plotly_chart(sweep_fig, use_container_width=True)
+    else:
+        st.line_chart(sweep.set_index(field)["prediction"])
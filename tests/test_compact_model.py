@@ -0,0 +1,75 @@
+# tests/test_compact_model.py
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from benchmarks.synthetic import generate_housing_frame
+from src.compact_model import CompactForest, check_parity
+from src.encoding import UNKNOWN_CODE
+from src.train import apply_labeling_option_B, encode_data
+
+TOLERANCE = 1e-12
+
+
+@pytest.fixture(scope="module")
+def data():
+    # Missing sizes/prices at fit time so the trees learn which way NaN goes
+    df, _ = encode_data(apply_labeling_option_B(generate_housing_frame(2000, seed=7, missing_rate=0.1)))
+    return df.drop(columns=["Good_Investment"]), df["Good_Investment"]
+
+
+@pytest.fixture(scope="module", params=["forest", "tree"])
+def fitted(request, data):
+    X, y = data
+    if request.param == "forest":
+        model = RandomForestClassifier(n_estimators=25, random_state=0, n_jobs=1)
+    else:
+        model = DecisionTreeClassifier(random_state=0)
+    model.fit(X, y)
+    return model, CompactForest.from_sklearn(model, source_sha256="abc")
+
+
+def _assert_parity(model, compact, X):
+    assert check_parity(model, compact, X) <= TOLERANCE
+    np.testing.assert_array_equal(model.predict(X), compact.predict(X))
+
+
+def test_matches_sklearn(fitted, data):
+    model, compact = fitted
+    _assert_parity(model, compact, data[0].iloc[:500])
+
+
+def test_missing_and_unseen_inputs(fitted, data):
+    model, compact = fitted
+    X = data[0].iloc[:30].astype("float64")
+    X.iloc[:10] = np.nan
+    X.iloc[10:20, [X.columns.get_loc(c) for c in ("City", "Locality", "Property_Type")]] = UNKNOWN_CODE
+    X.iloc[20:30, X.columns.get_loc("Size_in_SqFt")] = np.nan
+    _assert_parity(model, compact, X)
+
+
+def test_single_row(fitted, data):
+    model, compact = fitted
+    X = data[0]
+    for i in range(5):
+        row = X.iloc[[i]]
+        assert compact.predict_proba(row).shape == (1, len(model.classes_))
+        _assert_parity(model, compact, row)
+        np.testing.assert_allclose(compact.predict_proba(row.to_numpy()), model.predict_proba(row), rtol=0,
+                                   atol=TOLERANCE)
+
+
+def test_columns_are_matched_by_name(fitted, data):
+    model, compact = fitted
+    X = data[0].iloc[:50]
+    np.testing.assert_allclose(compact.predict_proba(X[X.columns[::-1]]), model.predict_proba(X), rtol=0,
+                               atol=TOLERANCE)
+
+
+def test_save_load_round_trip(fitted, data, tmp_path):
+    model, compact = fitted
+    loaded = CompactForest.load(compact.save(tmp_path / "compact_model.npz"))
+    assert loaded.source_sha256 == "abc"
+    assert loaded.feature_names == list(data[0].columns)
+    _assert_parity(model, loaded, data[0].iloc[:200])